@@ -13,13 +13,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 def main():
     try:
         from app import create_app, db
-        from app.models import Agent
+        from app.models import Agent, hash_password
+        from utils.verify_logins import verify_logins
         
         print("➕ Adding Missing AGENT001, AGENT002, AGENT003")
         print("=" * 50)
         
         # Create app with minimal config to avoid scheduler issues
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
             # Check what agents we need to add
@@ -53,60 +54,58 @@ def main():
                 }
             ]
             
-            added_count = 0
+            new_agents = []
+            # Hash each distinct password once and share it across agents
+            password_hashes = {}
             
-            for agent_data in needed_agents:
-                # Check if agent already exists
-                existing = Agent.query.filter_by(employee_id=agent_data['employee_id']).first()
+            # One transaction covers the lookup and the inserts; any error
+            # propagates out of the block and rolls the whole batch back
+            with db.session.begin():
+                # Resolve which agents already exist in a single query
+                needed_ids = {a['employee_id'] for a in needed_agents}
+                existing_ids = {
+                    row[0] for row in db.session.query(Agent.employee_id)
+                    .filter(Agent.employee_id.in_(needed_ids)).all()
+                }
                 
-                if existing:
-                    print(f"  ✅ {agent_data['employee_id']} already exists")
-                else:
-                    try:
-                        # Create new agent
-                        agent = Agent(
-                            employee_id=agent_data['employee_id'],
-                            first_name=agent_data['first_name'],
-                            last_name=agent_data['last_name'],
-                            role=agent_data['role'],
-                            status=agent_data['status'],
-                            is_active=True
-                        )
-                        
-                        # Set email and password
-                        agent.email = agent_data['email']
-                        agent.set_password(agent_data['password'])
-                        
-                        db.session.add(agent)
-                        print(f"  ➕ Created {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']}")
-                        added_count += 1
-                        
-                    except Exception as e:
-                        print(f"  ❌ Error creating {agent_data['employee_id']}: {e}")
-                        db.session.rollback()
-                        return
+                for agent_data in needed_agents:
+                    if agent_data['employee_id'] in existing_ids:
+                        print(f"  ✅ {agent_data['employee_id']} already exists")
+                        continue
+                    
+                    # Create new agent
+                    agent = Agent(
+                        employee_id=agent_data['employee_id'],
+                        first_name=agent_data['first_name'],
+                        last_name=agent_data['last_name'],
+                        role=agent_data['role'],
+                        status=agent_data['status'],
+                        is_active=True
+                    )
+                    
+                    # Set email and password
+                    agent.email = agent_data['email']
+                    password = agent_data['password']
+                    if password not in password_hashes:
+                        password_hashes[password] = hash_password(password)
+                    agent.password_hash = password_hashes[password]
+                    
+                    new_agents.append(agent)
+                    print(f"  ➕ Created {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']}")
+                
+                db.session.add_all(new_agents)
+            
+            added_count = len(new_agents)
             
             if added_count > 0:
-                # Commit changes
-                db.session.commit()
                 print(f"\n✅ Successfully added {added_count} agents!")
             else:
                 print(f"\n✅ All required agents already exist!")
             
             # Test login credentials
             print(f"\n🧪 Testing Login Credentials:")
-            test_credentials = [
-                ('ADMIN001', 'admin123'),
-                ('AGENT001', 'agent123'),
-                ('AGENT002', 'agent123'),
-                ('AGENT003', 'agent123')
-            ]
-            
-            from werkzeug.security import check_password_hash
-            
-            for emp_id, password in test_credentials:
-                agent = Agent.query.filter_by(employee_id=emp_id).first()
-                if agent and agent.password_hash and check_password_hash(agent.password_hash, password):
+            for emp_id, password, agent, works in verify_logins():
+                if works:
                     status_icon = "🟢" if agent.status == 'available' else "🟡"
                     print(f"  {status_icon} {emp_id} / {password} - ✅ LOGIN WORKS")
                 elif agent:
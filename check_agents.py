@@ -5,57 +5,77 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'
 
 from app import create_app, db
 from app.models import Agent
-from werkzeug.security import check_password_hash
+from sqlalchemy import func, or_
+from sqlalchemy.orm import defer
+from utils.verify_logins import verify_logins, identify_password
 
-def check_agents(app):
+def check_agents(app, verbose=False):
     with app.app_context():
         print("🔍 Agent Database Analysis")
         print("=" * 50)
         
-        # Get all agents
-        agents = Agent.query.all()
+        # Role/status breakdown computed in SQL rather than over loaded rows
+        stats = db.session.query(
+            Agent.role, Agent.status, func.count(Agent.id)
+        ).group_by(Agent.role, Agent.status).all()
+        total_count = sum(count for _, _, count in stats)
         
-        if not agents:
+        if not total_count:
             print("❌ No agents found in database!")
             print("\n💡 Recommendation: Run 'python reset_agents.py' to create fresh agents")
             return
         
-        print(f"📊 Total agents in database: {len(agents)}")
+        print(f"📊 Total agents in database: {total_count}")
         print()
         
-        # Analyze each agent
-        for i, agent in enumerate(agents, 1):
-            print(f"Agent {i}:")
-            print(f"  🆔 ID: {agent.id}")
-            print(f"  👤 Employee ID: {agent.employee_id}")
-            print(f"  📛 Name: {agent.first_name} {agent.last_name}")
-            print(f"  📧 Email: {agent.email}")
-            print(f"  🎭 Role: {agent.role}")
-            print(f"  📊 Status: {agent.status}")
-            print(f"  ✅ Active: {agent.is_active}")
-            print(f"  🔐 Has Password: {'Yes' if agent.password_hash else 'No'}")
+        # Full rows (and email decryption) are only needed for the detailed listing
+        if verbose:
+            # Defer the hash column: the listing only needs a has-password
+            # flag, and hashes are fetched in one targeted query for the
+            # rows whose password actually gets tested
+            rows = db.session.query(
+                Agent, Agent.password_hash.isnot(None).label('has_password')
+            ).options(defer(Agent.password_hash)).all()
+            password_hashes = dict(
+                db.session.query(Agent.id, Agent.password_hash).filter(
+                    Agent.id.in_([agent.id for agent, has_password in rows if has_password])
+                ).all()
+            )
             
-            # Test password verification
-            if agent.password_hash:
-                test_passwords = ['admin123', 'agent123', 'password']
-                password_works = None
-                for pwd in test_passwords:
-                    if check_password_hash(agent.password_hash, pwd):
-                        password_works = pwd
-                        break
+            # Analyze each agent
+            for i, (agent, has_password) in enumerate(rows, 1):
+                print(f"Agent {i}:")
+                print(f"  🆔 ID: {agent.id}")
+                print(f"  👤 Employee ID: {agent.employee_id}")
+                print(f"  📛 Name: {agent.first_name} {agent.last_name}")
+                print(f"  📧 Email: {agent.email}")
+                print(f"  🎭 Role: {agent.role}")
+                print(f"  📊 Status: {agent.status}")
+                print(f"  ✅ Active: {agent.is_active}")
+                print(f"  🔐 Has Password: {'Yes' if has_password else 'No'}")
                 
-                if password_works:
-                    print(f"  🔑 Password: {password_works} ✅")
-                else:
-                    print(f"  🔑 Password: Unknown ❌")
-            
-            print()
+                # Test password verification
+                if has_password:
+                    # Try the role's default password first so the usual case
+                    # matches on the first KDF run
+                    if agent.role == 'admin':
+                        test_passwords = ('admin123', 'agent123', 'password')
+                    else:
+                        test_passwords = ('agent123', 'admin123', 'password')
+                    password_works = identify_password(password_hashes[agent.id], test_passwords)
+                    
+                    if password_works:
+                        print(f"  🔑 Password: {password_works} ✅")
+                    else:
+                        print(f"  🔑 Password: Unknown ❌")
+                
+                print()
         
         # Summary and recommendations
         print("📋 Summary:")
-        admin_count = len([a for a in agents if a.role == 'admin'])
-        agent_count = len([a for a in agents if a.role == 'agent'])
-        available_count = len([a for a in agents if a.status == 'available'])
+        admin_count = sum(count for role, _, count in stats if role == 'admin')
+        agent_count = sum(count for role, _, count in stats if role == 'agent')
+        available_count = sum(count for _, status, count in stats if status == 'available')
         
         print(f"  👑 Admins: {admin_count}")
         print(f"  👷 Agents: {agent_count}")
@@ -63,17 +83,9 @@ def check_agents(app):
         
         # Check for specific agents
         print("\n🎯 Login Test Results:")
-        test_credentials = [
-            ('ADMIN001', 'admin123'),
-            ('AGENT001', 'agent123'),
-            ('AGENT002', 'agent123'),
-            ('AGENT003', 'agent123')
-        ]
-        
-        for emp_id, password in test_credentials:
-            agent = Agent.query.filter_by(employee_id=emp_id).first()
+        for emp_id, password, agent, works in verify_logins():
             if agent:
-                if agent.password_hash and check_password_hash(agent.password_hash, password):
+                if works:
                     print(f"  ✅ {emp_id} / {password} - LOGIN WORKS")
                 else:
                     print(f"  ❌ {emp_id} / {password} - INVALID PASSWORD")
@@ -88,15 +100,18 @@ def check_agents(app):
         if available_count == 0:
             print("  ⚠️  No available agents - ticket assignment will fail")
         
-        # Check for common issues
+        # Check for common issues; the filters run in SQL so only the
+        # offending employee IDs are fetched
+        valid_statuses = ['available', 'busy', 'offline', 'break']
         issues = []
-        for agent in agents:
-            if not agent.password_hash:
-                issues.append(f"Agent {agent.employee_id} has no password")
-            if not agent.email:
-                issues.append(f"Agent {agent.employee_id} has no email")
-            if agent.status not in ['available', 'busy', 'offline', 'break']:
-                issues.append(f"Agent {agent.employee_id} has invalid status: {agent.status}")
+        for (employee_id,) in db.session.query(Agent.employee_id).filter(Agent.password_hash.is_(None)):
+            issues.append(f"Agent {employee_id} has no password")
+        for (employee_id,) in db.session.query(Agent.employee_id).filter(Agent._email.is_(None)):
+            issues.append(f"Agent {employee_id} has no email")
+        for employee_id, status in db.session.query(Agent.employee_id, Agent.status).filter(
+            or_(Agent.status.is_(None), Agent.status.notin_(valid_statuses))
+        ):
+            issues.append(f"Agent {employee_id} has invalid status: {status}")
         
         if issues:
             print("\n⚠️  Issues Found:")
@@ -106,5 +121,5 @@ def check_agents(app):
             print("\n✅ No issues found with agent data")
 
 if __name__ == '__main__':
-    app = create_app()
-    check_agents(app)
+    app = create_app(minimal=True)
+    check_agents(app, verbose='--verbose' in sys.argv[1:])
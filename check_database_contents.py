@@ -10,6 +10,17 @@ import sqlite3
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# Maximum rows listed per section by the ORM check, most recent first
+DISPLAY_LIMIT = 50
+
+def _iter_rows(cursor):
+    """Yield rows in cursor.arraysize batches instead of one fetchall()"""
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            return
+        yield from rows
+
 def check_sqlite_directly():
     """Check SQLite database directly"""
     db_path = r'c:\Users\Gadaphy\Documents\Projects\CNI-Digital-Queue-Management-System\src\instance\cni_db.sqlite'
@@ -24,50 +35,60 @@ def check_sqlite_directly():
     
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
-        print(f"📋 TABLES FOUND: {len(tables)}")
-        for table in tables:
-            print(f"  - {table[0]}")
         
-        # Check agents
-        print(f"\n👥 AGENTS:")
-        cursor.execute("SELECT id, employee_id, first_name, last_name, status FROM agent;")
-        agents = cursor.fetchall()
-        for agent in agents:
-            print(f"  - ID: {agent[0]}, Employee: {agent[1]}, Name: {agent[2]} {agent[3]}, Status: {agent[4]}")
-        
-        # Check citizens
-        print(f"\n👤 CITIZENS:")
-        cursor.execute("SELECT id, first_name, last_name, phone, email FROM citizen;")
-        citizens = cursor.fetchall()
-        for citizen in citizens:
-            print(f"  - ID: {citizen[0]}, Name: {citizen[1]} {citizen[2]}, Phone: {citizen[3]}")
-        
-        # Check service types
-        print(f"\n🏢 SERVICE TYPES:")
-        cursor.execute("SELECT id, name_fr, name_en, estimated_duration FROM service_type;")
-        services = cursor.fetchall()
-        for service in services:
-            print(f"  - ID: {service[0]}, FR: {service[1]}, EN: {service[2]}, Duration: {service[3]}min")
-        
-        # Check queue entries
-        print(f"\n🎫 QUEUE ENTRIES:")
-        cursor.execute("""
-            SELECT q.id, q.ticket_number, q.status, q.agent_id, c.first_name, c.last_name, s.name_fr 
-            FROM queue q 
-            LEFT JOIN citizen c ON q.citizen_id = c.id 
-            LEFT JOIN service_type s ON q.service_type_id = s.id
-            ORDER BY q.created_at DESC;
-        """)
-        tickets = cursor.fetchall()
-        for ticket in tickets:
-            agent_info = f"Agent {ticket[3]}" if ticket[3] else "Unassigned"
-            print(f"  - {ticket[1]}: {ticket[2]} ({agent_info}) - {ticket[4]} {ticket[5]} - {ticket[6]}")
+        # Run every probe in one transaction and fetch in large batches to
+        # keep sqlite3 C-API round trips down
+        with conn:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            
+            # Get all tables
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            tables = cursor.fetchall()
+            
+            print(f"📋 TABLES FOUND: {len(tables)}")
+            for table in tables:
+                print(f"  - {table[0]}")
+            
+            # Row counts for the core tables in a single statement
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM agent),
+                       (SELECT COUNT(*) FROM citizen),
+                       (SELECT COUNT(*) FROM service_type);
+            """)
+            agent_count, citizen_count, service_count = cursor.fetchone()
+            print(f"\n📊 COUNTS: {agent_count} agents, {citizen_count} citizens, {service_count} service types")
+            
+            # Check agents
+            print(f"\n👥 AGENTS:")
+            cursor.execute("SELECT id, employee_id, first_name, last_name, status FROM agent;")
+            for agent in _iter_rows(cursor):
+                print(f"  - ID: {agent[0]}, Employee: {agent[1]}, Name: {agent[2]} {agent[3]}, Status: {agent[4]}")
+            
+            # Check citizens
+            print(f"\n👤 CITIZENS:")
+            cursor.execute("SELECT id, first_name, last_name, phone, email FROM citizen;")
+            for citizen in _iter_rows(cursor):
+                print(f"  - ID: {citizen[0]}, Name: {citizen[1]} {citizen[2]}, Phone: {citizen[3]}")
+            
+            # Check service types
+            print(f"\n🏢 SERVICE TYPES:")
+            cursor.execute("SELECT id, name_fr, name_en, estimated_duration FROM service_type;")
+            for service in _iter_rows(cursor):
+                print(f"  - ID: {service[0]}, FR: {service[1]}, EN: {service[2]}, Duration: {service[3]}min")
+            
+            # Check queue entries
+            print(f"\n🎫 QUEUE ENTRIES:")
+            cursor.execute("""
+                SELECT q.id, q.ticket_number, q.status, q.agent_id, c.first_name, c.last_name, s.name_fr 
+                FROM queue q 
+                LEFT JOIN citizen c ON q.citizen_id = c.id 
+                LEFT JOIN service_type s ON q.service_type_id = s.id
+                ORDER BY q.created_at DESC;
+            """)
+            for ticket in _iter_rows(cursor):
+                agent_info = f"Agent {ticket[3]}" if ticket[3] else "Unassigned"
+                print(f"  - {ticket[1]}: {ticket[2]} ({agent_info}) - {ticket[4]} {ticket[5]} - {ticket[6]}")
         
         conn.close()
         
@@ -79,31 +100,39 @@ def check_with_flask():
     try:
         from app import create_app, db
         from app.models import Queue, Agent, Citizen, ServiceType
+        from sqlalchemy.orm import joinedload
         
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
             print(f"\n🔍 FLASK ORM CHECK:")
             print("=" * 30)
             
             # Check agents
-            agents = Agent.query.all()
-            print(f"👥 Agents: {len(agents)}")
+            agents = Agent.query.order_by(Agent.created_at.desc()).limit(DISPLAY_LIMIT).all()
+            print(f"👥 Agents: {Agent.query.count()} (showing up to {DISPLAY_LIMIT} most recent)")
             for agent in agents:
                 print(f"  - {agent.employee_id}: {agent.first_name} {agent.last_name} ({agent.status})")
             
             # Check tickets
-            tickets = Queue.query.all()
-            print(f"\n🎫 Queue entries: {len(tickets)}")
+            # Load citizen and service type in the same SELECT, like the raw SQL probe
+            tickets = Queue.query.options(
+                joinedload(Queue.citizen), joinedload(Queue.service_type)
+            ).order_by(Queue.created_at.desc()).limit(DISPLAY_LIMIT).all()
+            print(f"\n🎫 Queue entries: {Queue.query.count()} (showing up to {DISPLAY_LIMIT} most recent)")
             for ticket in tickets:
                 agent_info = f"Agent {ticket.agent_id}" if ticket.agent_id else "Unassigned"
-                print(f"  - {ticket.ticket_number}: {ticket.status} ({agent_info})")
+                citizen = ticket.citizen
+                citizen_name = f"{citizen.first_name} {citizen.last_name}" if citizen else "Unknown"
+                service_name = ticket.service_type.name_fr if ticket.service_type else "Unknown"
+                print(f"  - {ticket.ticket_number}: {ticket.status} ({agent_info}) - {citizen_name} - {service_name}")
             
             # Check Marie's tickets specifically
             marie = Agent.query.filter_by(employee_id='AGT001').first()
             if marie:
-                marie_tickets = Queue.query.filter_by(agent_id=marie.id).all()
-                print(f"\n👤 Marie Kouassi's tickets: {len(marie_tickets)}")
+                marie_query = Queue.query.filter_by(agent_id=marie.id)
+                marie_tickets = marie_query.order_by(Queue.created_at.desc()).limit(DISPLAY_LIMIT).all()
+                print(f"\n👤 Marie Kouassi's tickets: {marie_query.count()}")
                 for ticket in marie_tickets:
                     print(f"  - {ticket.ticket_number}: {ticket.status}")
             
@@ -6,73 +6,78 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'
 from app import create_app, db
 from app.models import Agent
 
+def _print_agent_details(agent):
+    """Print an existing agent's name and status without decrypting its email"""
+    print(f"   Name: {agent.first_name} {agent.last_name}")
+    print(f"   Status: {agent.status}")
+
 def create_admin(app):
     with app.app_context():
         print("🔍 Checking existing agents in database...")
         
-        # List all existing agents first
-        existing_agents = Agent.query.all()
-        print(f"Found {len(existing_agents)} existing agents:")
-        for agent in existing_agents:
-            print(f"  - {agent.employee_id}: {agent.first_name} {agent.last_name} ({agent.role})")
+        new_agents = []
         
-        # Check if admin already exists
-        existing_admin = Agent.query.filter_by(employee_id='ADMIN001').first()
-        if existing_admin:
-            print("\n✅ Admin user (ADMIN001) already exists.")
-            print(f"   Name: {existing_admin.first_name} {existing_admin.last_name}")
-            print(f"   Email: {existing_admin.email}")
-            print(f"   Status: {existing_admin.status}")
-        else:
-            try:
-                admin = Agent(
-                    employee_id='ADMIN001',
-                    first_name='Admin',
-                    last_name='User',
-                    role='admin',
-                    status='available',
-                    is_active=True
-                )
-                # Set email using the property setter to handle encryption
-                admin.email = 'admin@cni.com'
-                admin.set_password('admin123')
+        try:
+            # One transaction for the lookups and both inserts: a single
+            # commit, and any failure rolls the whole seed back
+            with db.session.begin():
+                # List all existing agents first
+                existing_agents = Agent.query.all()
+                print(f"Found {len(existing_agents)} existing agents:")
+                for agent in existing_agents:
+                    print(f"  - {agent.employee_id}: {agent.first_name} {agent.last_name} ({agent.role})")
+                
+                # Every agent is already loaded; look the seed ones up here
+                agents_by_employee_id = {agent.employee_id: agent for agent in existing_agents}
+                
+                # Check if admin already exists
+                if 'ADMIN001' in agents_by_employee_id:
+                    print("\n✅ Admin user (ADMIN001) already exists.")
+                    _print_agent_details(agents_by_employee_id['ADMIN001'])
+                else:
+                    admin = Agent(
+                        employee_id='ADMIN001',
+                        first_name='Admin',
+                        last_name='User',
+                        role='admin',
+                        status='available',
+                        is_active=True
+                    )
+                    # Set email using the property setter to handle encryption
+                    admin.email = 'admin@cni.com'
+                    admin.set_password('admin123')
+                    new_agents.append(admin)
+                
+                # Check if test agent already exists
+                if 'AGENT001' in agents_by_employee_id:
+                    print("\n✅ Test agent (AGENT001) already exists.")
+                    _print_agent_details(agents_by_employee_id['AGENT001'])
+                else:
+                    agent = Agent(
+                        employee_id='AGENT001',
+                        first_name='Test',
+                        last_name='Agent',
+                        role='agent',
+                        status='available',  # Set agent as available for assignment
+                        is_active=True
+                    )
+                    # Set email using the property setter to handle encryption
+                    agent.email = 'agent@cni.com'
+                    agent.set_password('agent123')
+                    new_agents.append(agent)
                 
-                db.session.add(admin)
-                db.session.commit()
+                db.session.add_all(new_agents)
+        except Exception as e:
+            print(f"\n❌ Error creating seed agents: {str(e)}")
+            return
+        
+        for created in new_agents:
+            if created.role == 'admin':
                 print("\n✅ Admin user created successfully.")
                 print("   Credentials: ADMIN001 / admin123")
-            except Exception as e:
-                print(f"\n❌ Error creating admin: {str(e)}")
-                db.session.rollback()
-
-        # Check if test agent already exists
-        existing_agent = Agent.query.filter_by(employee_id='AGENT001').first()
-        if existing_agent:
-            print("\n✅ Test agent (AGENT001) already exists.")
-            print(f"   Name: {existing_agent.first_name} {existing_agent.last_name}")
-            print(f"   Email: {existing_agent.email}")
-            print(f"   Status: {existing_agent.status}")
-        else:
-            try:
-                agent = Agent(
-                    employee_id='AGENT001',
-                    first_name='Test',
-                    last_name='Agent',
-                    role='agent',
-                    status='available',  # Set agent as available for assignment
-                    is_active=True
-                )
-                # Set email using the property setter to handle encryption
-                agent.email = 'agent@cni.com'
-                agent.set_password('agent123')
-                
-                db.session.add(agent)
-                db.session.commit()
+            else:
                 print("\n✅ Test agent created successfully.")
                 print("   Credentials: AGENT001 / agent123")
-            except Exception as e:
-                print(f"\n❌ Error creating agent: {str(e)}")
-                db.session.rollback()
         
         # Final summary
         print(f"\n📊 Final agent count: {Agent.query.count()}")
@@ -83,5 +88,5 @@ def create_admin(app):
             print(f"   {agent.employee_id}: {password} ({agent.role})")
 
 if __name__ == '__main__':
-    app = create_app()
+    app = create_app(minimal=True)
     create_admin(app)
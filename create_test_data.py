@@ -1,17 +1,108 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
 
 from app import create_app, db
-from app.models import Agent, ServiceType, Station, Citizen
-from datetime import datetime, date
+from app.models import Agent, ServiceType, Station, Citizen, hash_password
+from app.utils.encryption import encryption
+from datetime import datetime, date, timedelta
+
+# Named test citizens; always seeded first
+CITIZEN_FIXTURES = [
+    {
+        'pre_enrollment_code': 'TEST001',
+        'first_name': 'Jean',
+        'last_name': 'Dupont',
+        'date_of_birth': date(1980, 5, 15),
+        'phone_number': '0123456789',
+        'email': 'jean.dupont@example.com',
+        'preferred_language': 'fr',
+        'special_needs': None
+    },
+    {
+        'pre_enrollment_code': 'TEST002',
+        'first_name': 'Marie',
+        'last_name': 'Martin',
+        'date_of_birth': date(1945, 8, 22),
+        'phone_number': '0123456790',
+        'email': 'marie.martin@example.com',
+        'preferred_language': 'fr',
+        'special_needs': 'elderly'
+    },
+    {
+        'pre_enrollment_code': 'TEST003',
+        'first_name': 'Ahmed',
+        'last_name': 'Hassan',
+        'date_of_birth': date(1990, 12, 3),
+        'phone_number': '0123456791',
+        'email': 'ahmed.hassan@example.com',
+        'preferred_language': 'fr',
+        'special_needs': 'disability'
+    },
+    {
+        'pre_enrollment_code': 'TEST004',
+        'first_name': 'Sophie',
+        'last_name': 'Bernard',
+        'date_of_birth': date(1985, 3, 10),
+        'phone_number': '0123456792',
+        'email': 'sophie.bernard@example.com',
+        'preferred_language': 'fr',
+        'special_needs': 'pregnant'
+    },
+    {
+        'pre_enrollment_code': 'TEST005',
+        'first_name': 'John',
+        'last_name': 'Smith',
+        'date_of_birth': date(1975, 7, 18),
+        'phone_number': '0123456793',
+        'email': 'john.smith@example.com',
+        'preferred_language': 'en',
+        'special_needs': None
+    }
+]
+
+def gen_citizens(n):
+    """Yield n citizen rows: the named fixtures, then generated ones
+
+    Rows are plain dicts for the Core executemany insert, so the same code
+    path seeds 5 or 500k citizens (paged by insertmanyvalues_page_size).
+    """
+    for i in range(n):
+        if i < len(CITIZEN_FIXTURES):
+            yield CITIZEN_FIXTURES[i]
+            continue
+        yield {
+            'pre_enrollment_code': f'TEST{i:06d}',
+            'first_name': f'User{i}',
+            'last_name': 'Test',
+            'date_of_birth': date(1960, 1, 1) + timedelta(days=i % 15000),
+            'phone_number': f'06{i:08d}',
+            'email': f'user{i}@example.com',
+            'preferred_language': 'fr' if i % 4 else 'en',
+            'special_needs': None
+        }
+
+def _existing_keys(app, column, values):
+    """Return the subset of values already present in column
+
+    Runs under its own app context so each worker thread gets a separate
+    scoped session.
+    """
+    existing = set()
+    with app.app_context():
+        # Chunk the IN list so large seeds stay under bind-parameter limits
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            existing.update(row[0] for row in db.session.query(column).filter(column.in_(chunk)))
+    return existing
 
 def create_test_data(app):
     with app.app_context():
         print("Creating test data for CNI Digital Queue Management System...")
         
-        # Create Service Types
+        # Service Types
         service_types = [
             {
                 'code': 'NEW_APP',
@@ -60,14 +151,7 @@ def create_test_data(app):
             }
         ]
         
-        for service_data in service_types:
-            existing = ServiceType.query.filter_by(code=service_data['code']).first()
-            if not existing:
-                service = ServiceType(**service_data)
-                db.session.add(service)
-                print(f"Created service type: {service_data['name_en']}")
-        
-        # Create Stations
+        # Stations
         stations = [
             {
                 'station_number': 'ST001',
@@ -95,75 +179,10 @@ def create_test_data(app):
             }
         ]
         
-        for station_data in stations:
-            existing = Station.query.filter_by(station_number=station_data['station_number']).first()
-            if not existing:
-                station = Station(**station_data)
-                db.session.add(station)
-                print(f"Created station: {station_data['name']}")
-        
-        # Create Test Citizens
-        citizens = [
-            {
-                'pre_enrollment_code': 'TEST001',
-                'first_name': 'Jean',
-                'last_name': 'Dupont',
-                'date_of_birth': date(1980, 5, 15),
-                'phone_number': '0123456789',
-                'email': 'jean.dupont@example.com',
-                'preferred_language': 'fr',
-                'special_needs': None
-            },
-            {
-                'pre_enrollment_code': 'TEST002',
-                'first_name': 'Marie',
-                'last_name': 'Martin',
-                'date_of_birth': date(1945, 8, 22),
-                'phone_number': '0123456790',
-                'email': 'marie.martin@example.com',
-                'preferred_language': 'fr',
-                'special_needs': 'elderly'
-            },
-            {
-                'pre_enrollment_code': 'TEST003',
-                'first_name': 'Ahmed',
-                'last_name': 'Hassan',
-                'date_of_birth': date(1990, 12, 3),
-                'phone_number': '0123456791',
-                'email': 'ahmed.hassan@example.com',
-                'preferred_language': 'fr',
-                'special_needs': 'disability'
-            },
-            {
-                'pre_enrollment_code': 'TEST004',
-                'first_name': 'Sophie',
-                'last_name': 'Bernard',
-                'date_of_birth': date(1985, 3, 10),
-                'phone_number': '0123456792',
-                'email': 'sophie.bernard@example.com',
-                'preferred_language': 'fr',
-                'special_needs': 'pregnant'
-            },
-            {
-                'pre_enrollment_code': 'TEST005',
-                'first_name': 'John',
-                'last_name': 'Smith',
-                'date_of_birth': date(1975, 7, 18),
-                'phone_number': '0123456793',
-                'email': 'john.smith@example.com',
-                'preferred_language': 'en',
-                'special_needs': None
-            }
-        ]
-        
-        for citizen_data in citizens:
-            existing = Citizen.query.filter_by(pre_enrollment_code=citizen_data['pre_enrollment_code']).first()
-            if not existing:
-                citizen = Citizen(**citizen_data)
-                db.session.add(citizen)
-                print(f"Created citizen: {citizen_data['first_name']} {citizen_data['last_name']}")
+        # Test Citizens (SEED_CITIZENS > 5 adds generated load-test citizens)
+        citizens = list(gen_citizens(int(os.environ.get('SEED_CITIZENS', '5'))))
         
-        # Create Additional Agents
+        # Additional Agents
         agents = [
             {
                 'employee_id': 'AGENT002',
@@ -183,22 +202,73 @@ def create_test_data(app):
             }
         ]
         
-        for agent_data in agents:
-            existing = Agent.query.filter_by(employee_id=agent_data['employee_id']).first()
-            if not existing:
-                agent = Agent(
-                    employee_id=agent_data['employee_id'],
-                    first_name=agent_data['first_name'],
-                    last_name=agent_data['last_name'],
-                    role=agent_data['role'],
-                    status=agent_data['status']
-                )
-                agent.email = agent_data['email']
-                agent.set_password('agent123')  # Same password for all test agents
-                db.session.add(agent)
+        # The existence checks are independent reads, so run them
+        # concurrently, each worker on its own app context and session
+        lookups = [
+            (ServiceType.code, [s['code'] for s in service_types]),
+            (Station.station_number, [s['station_number'] for s in stations]),
+            (Citizen.pre_enrollment_code, [c['pre_enrollment_code'] for c in citizens]),
+            (Agent.employee_id, [a['employee_id'] for a in agents])
+        ]
+        with ThreadPoolExecutor(max_workers=len(lookups)) as executor:
+            existing_codes, existing_stations, existing_citizens, existing_ids = executor.map(
+                lambda lookup: _existing_keys(app, *lookup), lookups
+            )
+        
+        # Seed everything in one transaction: a single commit, and any
+        # error propagates out of the block and rolls the whole run back
+        with db.session.begin():
+            # Create Service Types
+            rows = [s for s in service_types if s['code'] not in existing_codes]
+            if rows:
+                db.session.execute(ServiceType.__table__.insert(), rows)
+            for service_data in rows:
+                print(f"Created service type: {service_data['name_en']}")
+            
+            # Create Stations
+            rows = [s for s in stations if s['station_number'] not in existing_stations]
+            if rows:
+                db.session.execute(Station.__table__.insert(), rows)
+            for station_data in rows:
+                print(f"Created station: {station_data['name']}")
+            
+            # Create Test Citizens
+            # Core inserts bypass the model property setters, so encrypt the
+            # contact columns here the same way Citizen.phone_number/email would
+            rows = [
+                dict(c, phone_number=encryption.encrypt_phone(c['phone_number']),
+                     email=encryption.encrypt(c['email']))
+                for c in citizens if c['pre_enrollment_code'] not in existing_citizens
+            ]
+            if rows:
+                db.session.execute(Citizen.__table__.insert(), rows)
+            for citizen_data in rows[:len(CITIZEN_FIXTURES)]:
+                print(f"Created citizen: {citizen_data['first_name']} {citizen_data['last_name']}")
+            if len(rows) > len(CITIZEN_FIXTURES):
+                print(f"Created {len(rows) - len(CITIZEN_FIXTURES)} more citizens")
+            
+            # Create Additional Agents
+            # All test agents share one password, so hash it only once; with
+            # the hash and encrypted email precomputed, agents can take the
+            # same bulk path as the other tables
+            agent_hash = hash_password('agent123')
+            new_agents = [
+                {
+                    'employee_id': a['employee_id'],
+                    'first_name': a['first_name'],
+                    'last_name': a['last_name'],
+                    'role': a['role'],
+                    'status': a['status'],
+                    '_email': encryption.encrypt(a['email']),
+                    'password_hash': agent_hash
+                }
+                for a in agents if a['employee_id'] not in existing_ids
+            ]
+            if new_agents:
+                db.session.bulk_insert_mappings(Agent, new_agents)
+            for agent_data in new_agents:
                 print(f"Created agent: {agent_data['first_name']} {agent_data['last_name']} (Password: agent123)")
         
-        db.session.commit()
         print("\n✅ Test data creation completed successfully!")
         print("\n📋 Summary:")
         print(f"- Service Types: {ServiceType.query.count()}")
@@ -213,9 +283,11 @@ def create_test_data(app):
         print("Agent 3: AGENT003 / agent123")
         
         print("\n🎫 Test Citizens:")
-        for citizen in citizens:
+        for citizen in citizens[:len(CITIZEN_FIXTURES)]:
             print(f"- {citizen['first_name']} {citizen['last_name']}: {citizen['pre_enrollment_code']}")
+        if len(citizens) > len(CITIZEN_FIXTURES):
+            print(f"- ... plus {len(citizens) - len(CITIZEN_FIXTURES)} generated citizens")
 
 if __name__ == '__main__':
-    app = create_app()
+    app = create_app(minimal=True)
     create_test_data(app)
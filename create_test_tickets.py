@@ -10,11 +10,15 @@ from datetime import datetime
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# Rows per executemany batch when inserting tickets
+TICKET_BATCH_SIZE = 1000
+
 def main():
     try:
         from app import create_app, db
         from app.models import Queue, Citizen, ServiceType
         from app.queue_logic.simple_optimizer import SimplePriorityCalculator
+        from sqlalchemy.orm import load_only, raiseload
         
         app = create_app()
         
@@ -23,8 +27,16 @@ def main():
             print("=" * 40)
             
             # Get available citizens and service types
-            citizens = Citizen.query.limit(5).all()
-            service_types = ServiceType.query.limit(3).all()
+            # Load only the columns the priority calculation and output use;
+            # raiseload flags any stray relationship access
+            citizens = Citizen.query.options(
+                load_only(Citizen.id, Citizen.first_name, Citizen.last_name, Citizen.special_needs),
+                raiseload('*')
+            ).limit(5).all()
+            service_types = ServiceType.query.options(
+                load_only(ServiceType.id, ServiceType.code, ServiceType.name_fr),
+                raiseload('*')
+            ).limit(3).all()
             
             if not citizens:
                 print("❌ No citizens found. Please create some citizens first.")
@@ -39,36 +51,45 @@ def main():
             # Create priority calculator
             priority_calc = SimplePriorityCalculator()
             
-            # Create 5 test tickets
-            tickets_created = 0
+            # Build all ticket rows first, then insert them in batches with
+            # Core executemany instead of one ORM flush per ticket
+            now = datetime.utcnow()
+            service_count = len(service_types)
+            # New tickets have no wait time, so the score depends only on the
+            # service type and the special needs; score each pair once
+            priority_scores = {}
+            rows = []
             for i, citizen in enumerate(citizens):
-                service_type = service_types[i % len(service_types)]
+                service_type = service_types[i % service_count]
                 
                 # Generate ticket number
                 ticket_number = f"TEST{1000 + i}"
                 
-                # Calculate priority (fix method name)
-                priority_score = priority_calc.calculate_priority_score(
-                    service_type_id=service_type.id,
-                    wait_time_minutes=0,
-                    is_elderly=citizen.is_elderly,
-                    is_disabled=citizen.is_disabled,
-                    is_pregnant=citizen.is_pregnant
-                )
-                
-                # Create ticket
-                ticket = Queue(
-                    ticket_number=ticket_number,
-                    citizen_id=citizen.id,
-                    service_type_id=service_type.id,
-                    priority_score=priority_score,
-                    status='waiting',
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
+                # Special factors come from the citizen's special_needs text
+                special_needs = (citizen.special_needs or '').lower()
+                score_key = (service_type.id, special_needs)
+                priority_score = priority_scores.get(score_key)
+                if priority_score is None:
+                    special_factors = {
+                        factor: True for factor in priority_calc.SPECIAL_NEEDS_BONUS
+                        if factor in special_needs
+                    }
+                    priority_score = priority_calc.calculate_priority_score(
+                        citizen, service_type,
+                        wait_time_minutes=0,
+                        special_factors=special_factors
+                    )
+                    priority_scores[score_key] = priority_score
                 
-                db.session.add(ticket)
-                tickets_created += 1
+                rows.append({
+                    'ticket_number': ticket_number,
+                    'citizen_id': citizen.id,
+                    'service_type_id': service_type.id,
+                    'priority_score': priority_score,
+                    'status': 'waiting',
+                    'created_at': now,
+                    'updated_at': now
+                })
                 
                 print(f"✅ Created ticket {ticket_number}")
                 print(f"   Citizen: {citizen.first_name} {citizen.last_name}")
@@ -76,7 +97,10 @@ def main():
                 print(f"   Priority: {priority_score}")
                 print()
             
+            for start in range(0, len(rows), TICKET_BATCH_SIZE):
+                db.session.execute(Queue.__table__.insert(), rows[start:start + TICKET_BATCH_SIZE])
             db.session.commit()
+            tickets_created = len(rows)
             
             print(f"🎯 Successfully created {tickets_created} test tickets!")
             print("\nThese tickets are now available for assignment testing.")
@@ -12,7 +12,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 def main():
     try:
         from app import create_app, db
+        from app.models import Queue, Citizen
         from app.utils.optimized_queries import QueryOptimizer
+        from sqlalchemy import or_
+        from utils.script_output import emit_lines
         
         print("🔍 Debug Admin Dashboard Data")
         print("=" * 50)
@@ -29,23 +32,32 @@ def main():
             print(f"📊 Found {len(active_tickets)} active tickets:")
             print()
             
+            lines = []
             for i, ticket in enumerate(active_tickets[:5], 1):  # Show first 5
-                print(f"Ticket {i}:")
-                print(f"  🎫 Number: {ticket.ticket_number}")
-                print(f"  👤 Citizen: {ticket.citizen.first_name} {ticket.citizen.last_name}")
-                print(f"  🆔 PE Code: {ticket.citizen.pre_enrollment_code}")
-                print(f"  🏢 Service: {ticket.service_type.name_fr if ticket.service_type else 'None'}")
-                print(f"  📊 Priority: {ticket.priority_score}")
-                print(f"  📋 Status: {ticket.status}")
-                print(f"  👷 Agent: {f'{ticket.agent.first_name} {ticket.agent.last_name}' if ticket.agent else 'Unassigned'}")
-                print()
+                lines.append(f"Ticket {i}:")
+                lines.append(f"  🎫 Number: {ticket.ticket_number}")
+                lines.append(f"  👤 Citizen: {ticket.citizen.first_name} {ticket.citizen.last_name}")
+                lines.append(f"  🆔 PE Code: {ticket.citizen.pre_enrollment_code}")
+                lines.append(f"  🏢 Service: {ticket.service_type.name_fr if ticket.service_type else 'None'}")
+                lines.append(f"  📊 Priority: {ticket.priority_score}")
+                lines.append(f"  📋 Status: {ticket.status}")
+                lines.append(f"  👷 Agent: {f'{ticket.agent.first_name} {ticket.agent.last_name}' if ticket.agent else 'Unassigned'}")
+                lines.append('')
+            emit_lines(lines)
             
-            # Check if any tickets are missing PE codes
-            missing_pe_codes = [t for t in active_tickets if not t.citizen.pre_enrollment_code]
-            if missing_pe_codes:
-                print(f"⚠️  {len(missing_pe_codes)} tickets have missing PE codes:")
-                for ticket in missing_pe_codes[:3]:
-                    print(f"  - {ticket.ticket_number}: {ticket.citizen.first_name} {ticket.citizen.last_name}")
+            # Check if any active tickets are missing PE codes; the filter
+            # runs in SQL so only the offending ticket numbers are fetched
+            missing_pe_query = db.session.query(
+                Queue.ticket_number, Citizen.first_name, Citizen.last_name
+            ).join(Citizen, Queue.citizen_id == Citizen.id).filter(
+                Queue.status.in_(['waiting', 'assigned', 'in_progress']),
+                or_(Citizen.pre_enrollment_code.is_(None), Citizen.pre_enrollment_code == '')
+            )
+            missing_pe_count = missing_pe_query.count()
+            if missing_pe_count:
+                print(f"⚠️  {missing_pe_count} tickets have missing PE codes:")
+                for ticket_number, first_name, last_name in missing_pe_query.limit(3):
+                    print(f"  - {ticket_number}: {first_name} {last_name}")
             else:
                 print("✅ All tickets have PE codes")
                 
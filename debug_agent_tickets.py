@@ -6,6 +6,8 @@ Debug Agent Tickets - Check what tickets are actually assigned to Marie Kouassi
 import os
 import sys
 
+from sqlalchemy.orm import joinedload, selectinload
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
@@ -13,6 +15,7 @@ def main():
     try:
         from app import create_app, db
         from app.models import Queue, Agent, Citizen, ServiceType
+        from utils.script_output import emit_lines
         
         app = create_app()
         
@@ -26,50 +29,63 @@ def main():
                 print("❌ Marie Kouassi not found!")
                 return
             
-            print(f"👤 Agent: {marie.first_name} {marie.last_name}")
+            marie_name = f"{marie.first_name} {marie.last_name}"
+            print(f"👤 Agent: {marie_name}")
             print(f"   ID: {marie.id}")
             print(f"   Employee ID: {marie.employee_id}")
             
             # Check all tickets in system
             print(f"\n📊 ALL TICKETS IN SYSTEM:")
-            all_tickets = Queue.query.all()
+            # One query for every ticket; the per-agent and waiting views
+            # below are partitioned from it in memory
+            all_tickets = Queue.query.options(
+                joinedload(Queue.agent), joinedload(Queue.citizen)
+            ).all()
+            lines = []
             for ticket in all_tickets:
                 agent_info = f"Agent {ticket.agent_id}" if ticket.agent_id else "Unassigned"
-                print(f"  - {ticket.ticket_number}: {ticket.status} ({agent_info})")
+                lines.append(f"  - {ticket.ticket_number}: {ticket.status} ({agent_info})")
+            emit_lines(lines)
             
             # Check tickets assigned to Marie specifically
-            print(f"\n🎫 TICKETS ASSIGNED TO MARIE (Agent ID {marie.id}):")
-            marie_tickets = Queue.query.filter_by(agent_id=marie.id).all()
+            print(f"\n🎫 TICKETS ASSIGNED TO {marie_name.upper()} (Agent ID {marie.id}):")
+            marie_tickets = [t for t in all_tickets if t.agent_id == marie.id]
             print(f"Found: {len(marie_tickets)} tickets")
             
+            lines = []
             for ticket in marie_tickets:
-                print(f"  - {ticket.ticket_number}: {ticket.status}")
+                lines.append(f"  - {ticket.ticket_number}: {ticket.status}")
+            emit_lines(lines)
             
             # Check waiting tickets that might be auto-assigned
             print(f"\n⏳ WAITING TICKETS (might be shown as 'next citizen'):")
-            waiting_tickets = Queue.query.filter_by(status='waiting').all()
+            waiting_tickets = [t for t in all_tickets if t.status == 'waiting']
             print(f"Found: {len(waiting_tickets)} waiting tickets")
             
+            lines = []
             for ticket in waiting_tickets:
                 agent_info = f"Agent {ticket.agent_id}" if ticket.agent_id else "Unassigned"
-                print(f"  - {ticket.ticket_number}: {agent_info}")
+                lines.append(f"  - {ticket.ticket_number}: {agent_info}")
+            emit_lines(lines)
             
             # Test the exact query from agent dashboard
             print(f"\n🔍 TESTING AGENT DASHBOARD QUERY:")
             try:
-                from sqlalchemy.orm import joinedload
-                
+                # selectin loads each many-to-one in its own IN query instead of
+                # widening every ticket row with outer joins
                 test_tickets = Queue.query.options(
-                    joinedload(Queue.citizen),
-                    joinedload(Queue.service_type)
+                    selectinload(Queue.citizen),
+                    selectinload(Queue.service_type)
                 ).filter(
                     Queue.agent_id == marie.id,
                     Queue.status.in_(['waiting', 'in_progress'])
                 ).all()
                 
                 print(f"Dashboard query result: {len(test_tickets)} tickets")
+                lines = []
                 for ticket in test_tickets:
-                    print(f"  - {ticket.ticket_number}: {ticket.status} (Agent: {ticket.agent_id})")
+                    lines.append(f"  - {ticket.ticket_number}: {ticket.status} (Agent: {ticket.agent_id})")
+                emit_lines(lines)
                     
             except Exception as e:
                 print(f"❌ Dashboard query failed: {e}")
@@ -13,6 +13,8 @@ def main():
     try:
         from app import create_app, db
         from app.models import Agent, Queue, Citizen
+        from sqlalchemy import exists
+        from utils.script_output import emit_lines
         
         print("🔍 Debug Ticket Assignment")
         print("=" * 50)
@@ -25,15 +27,17 @@ def main():
             agents = Agent.query.all()
             available_agents = []
             
+            lines = []
             for agent in agents:
-                print(f"  👤 {agent.first_name} {agent.last_name}")
-                print(f"     Status: {agent.status}")
-                print(f"     Active: {agent.is_active}")
-                print(f"     Employee ID: {agent.employee_id}")
+                lines.append(f"  👤 {agent.first_name} {agent.last_name}")
+                lines.append(f"     Status: {agent.status}")
+                lines.append(f"     Active: {agent.is_active}")
+                lines.append(f"     Employee ID: {agent.employee_id}")
                 
                 if agent.status == 'available' and agent.is_active:
                     available_agents.append(agent)
-                print()
+                lines.append('')
+            emit_lines(lines)
             
             print(f"✅ Available agents for assignment: {len(available_agents)}")
             if available_agents:
@@ -46,12 +50,14 @@ def main():
             waiting_tickets = Queue.query.filter_by(status='waiting').all()
             print(f"Total waiting tickets: {len(waiting_tickets)}")
             
+            lines = []
             for i, ticket in enumerate(waiting_tickets[:5], 1):  # Show first 5
-                print(f"  {i}. Ticket #{ticket.ticket_number}")
-                print(f"     Status: {ticket.status}")
-                print(f"     Citizen: {ticket.citizen.first_name} {ticket.citizen.last_name}")
-                print(f"     Agent: {ticket.agent.first_name + ' ' + ticket.agent.last_name if ticket.agent else 'Unassigned'}")
-                print()
+                lines.append(f"  {i}. Ticket #{ticket.ticket_number}")
+                lines.append(f"     Status: {ticket.status}")
+                lines.append(f"     Citizen: {ticket.citizen.first_name} {ticket.citizen.last_name}")
+                lines.append(f"     Agent: {ticket.agent.first_name + ' ' + ticket.agent.last_name if ticket.agent else 'Unassigned'}")
+                lines.append('')
+            emit_lines(lines)
             
             # Test assignment logic
             if available_agents and waiting_tickets:
@@ -68,12 +74,13 @@ def main():
                 print(f"  - Status: {test_ticket.status}")
                 print(f"  - Status in ['waiting', 'in_progress']: {test_ticket.status in ['waiting', 'in_progress']}")
                 
-                # Check current tickets for agent
-                current_tickets = Queue.query.filter_by(
-                    agent_id=test_agent.id, 
-                    status='in_progress'
-                ).count()
-                print(f"  - Current tickets for agent: {current_tickets}")
+                # Check whether the agent is already serving a ticket; EXISTS
+                # stops at the first match instead of counting them all
+                has_active = db.session.query(exists().where(
+                    Queue.agent_id == test_agent.id,
+                    Queue.status == 'in_progress'
+                )).scalar()
+                print(f"  - Agent has a ticket in progress: {has_active}")
                 
             else:
                 print("❌ Cannot test assignment - missing available agents or waiting tickets")
@@ -13,6 +13,8 @@ def main():
     try:
         from app import create_app, db
         from app.models import Agent, Queue, Citizen, ServiceType
+        from sqlalchemy import func
+        from utils.script_output import emit_lines
         
         app = create_app()
         
@@ -26,7 +28,8 @@ def main():
                 print("❌ Marie Kouassi (AGT001) not found!")
                 return
             
-            print(f"👤 Found: {marie.first_name} {marie.last_name}")
+            marie_name = f"{marie.first_name} {marie.last_name}"
+            print(f"👤 Found: {marie_name}")
             print(f"   ID: {marie.id}")
             print(f"   Employee ID: {marie.employee_id}")
             print(f"   Status: {marie.status}")
@@ -34,19 +37,28 @@ def main():
             
             # Check all tickets assigned to her
             print("🎫 ALL TICKETS ASSIGNED TO MARIE:")
-            all_tickets = Queue.query.filter_by(agent_id=marie.id).all()
+            # Only the printed columns are selected, as plain rows
+            all_tickets = db.session.query(
+                Queue.id, Queue.ticket_number, Queue.status, Queue.agent_id,
+                Queue.priority_score, Queue.created_at, Queue.updated_at,
+                Citizen.first_name, Citizen.last_name, ServiceType.name_fr
+            ).join(Citizen, Queue.citizen_id == Citizen.id).outerjoin(
+                ServiceType, Queue.service_type_id == ServiceType.id
+            ).filter(Queue.agent_id == marie.id).all()
             print(f"Total tickets found: {len(all_tickets)}")
             
+            lines = []
             for i, ticket in enumerate(all_tickets, 1):
-                print(f"\n{i}. Ticket #{ticket.ticket_number}")
-                print(f"   Database ID: {ticket.id}")
-                print(f"   Status: {ticket.status}")
-                print(f"   Agent ID: {ticket.agent_id}")
-                print(f"   Citizen: {ticket.citizen.first_name} {ticket.citizen.last_name}")
-                print(f"   Service: {ticket.service_type.name_fr if ticket.service_type else 'Unknown'}")
-                print(f"   Priority: {ticket.priority_score}")
-                print(f"   Created: {ticket.created_at}")
-                print(f"   Updated: {ticket.updated_at}")
+                lines.append(f"\n{i}. Ticket #{ticket.ticket_number}")
+                lines.append(f"   Database ID: {ticket.id}")
+                lines.append(f"   Status: {ticket.status}")
+                lines.append(f"   Agent: {marie_name} (ID {ticket.agent_id})")
+                lines.append(f"   Citizen: {ticket.first_name} {ticket.last_name}")
+                lines.append(f"   Service: {ticket.name_fr or 'Unknown'}")
+                lines.append(f"   Priority: {ticket.priority_score}")
+                lines.append(f"   Created: {ticket.created_at}")
+                lines.append(f"   Updated: {ticket.updated_at}")
+            emit_lines(lines)
             
             # Check specifically waiting and in_progress tickets
             print("\n🔄 ACTIVE TICKETS (waiting + in_progress):")
@@ -56,8 +68,10 @@ def main():
             ).all()
             
             print(f"Active tickets count: {len(active_tickets)}")
+            lines = []
             for ticket in active_tickets:
-                print(f"  - {ticket.ticket_number}: {ticket.status}")
+                lines.append(f"  - {ticket.ticket_number}: {ticket.status}")
+            emit_lines(lines)
             
             # Check what the agent dashboard query would return
             print("\n🖥️ AGENT DASHBOARD QUERY TEST:")
@@ -69,15 +83,20 @@ def main():
             ).all()
             
             print(f"Dashboard query returns: {len(dashboard_tickets)} tickets")
+            lines = []
             for ticket in dashboard_tickets:
-                print(f"  - {ticket.ticket_number}: {ticket.status} (Priority: {ticket.priority_score})")
+                lines.append(f"  - {ticket.ticket_number}: {ticket.status} (Priority: {ticket.priority_score})")
+            emit_lines(lines)
             
             # Check all tickets in system
             print("\n📊 SYSTEM OVERVIEW:")
-            total_tickets = Queue.query.count()
-            waiting_tickets = Queue.query.filter_by(status='waiting').count()
-            in_progress_tickets = Queue.query.filter_by(status='in_progress').count()
-            completed_tickets = Queue.query.filter_by(status='completed').count()
+            status_counts = dict(
+                db.session.query(Queue.status, func.count(Queue.id)).group_by(Queue.status).all()
+            )
+            total_tickets = sum(status_counts.values())
+            waiting_tickets = status_counts.get('waiting', 0)
+            in_progress_tickets = status_counts.get('in_progress', 0)
+            completed_tickets = status_counts.get('completed', 0)
             
             print(f"Total tickets in system: {total_tickets}")
             print(f"Waiting: {waiting_tickets}")
@@ -92,8 +111,10 @@ def main():
             ).limit(5).all()
             
             print(f"Unassigned waiting tickets: {len(unassigned_waiting)}")
+            lines = []
             for ticket in unassigned_waiting:
-                print(f"  - {ticket.ticket_number}: {ticket.citizen.first_name} {ticket.citizen.last_name}")
+                lines.append(f"  - {ticket.ticket_number}: {ticket.citizen.first_name} {ticket.citizen.last_name}")
+            emit_lines(lines)
                 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -12,6 +12,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from app import create_app
 from app.models import db, Queue, Agent, Citizen, ServiceType
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from utils.script_output import emit_lines
+
+# Tickets fetched (and table rows written) per batch by the detail scan
+TICKET_CHUNK_SIZE = 500
 
 def debug_ticket_status():
     """Debug current ticket status in database"""
@@ -22,14 +28,12 @@ def debug_ticket_status():
         print("🔍 DEBUGGING TICKET STATUS IN DATABASE")
         print("=" * 50)
         
-        # Get all tickets with agent assignments
-        tickets_with_agents = Queue.query.filter(
-            Queue.agent_id.isnot(None)
-        ).join(Agent).join(Citizen).join(ServiceType).all()
+        assigned_filter = Queue.agent_id.isnot(None)
+        ticket_count = Queue.query.filter(assigned_filter).count()
         
-        print(f"📊 Found {len(tickets_with_agents)} tickets with agent assignments")
+        print(f"📊 Found {ticket_count} tickets with agent assignments")
         
-        if not tickets_with_agents:
+        if not ticket_count:
             print("❌ No tickets found with agent assignments!")
             return
         
@@ -41,15 +45,34 @@ def debug_ticket_status():
         print(f"{'Ticket':<12} {'Agent':<15} {'Citizen':<20} {'Status':<12} {'Created':<10}")
         print("-" * 80)
         
+        # Stream tickets with agent assignments in chunks rather than
+        # materialising them all; the relationships printed below are
+        # eager-loaded so the table needs no per-row SELECTs
+        tickets_with_agents = Queue.query.options(
+            joinedload(Queue.agent),
+            joinedload(Queue.citizen),
+            joinedload(Queue.service_type)
+        ).filter(assigned_filter).yield_per(TICKET_CHUNK_SIZE)
+        
+        lines = []
+        # Agents own many tickets; format each agent's name once
+        agent_names = {}
         for ticket in tickets_with_agents:
-            agent_name = f"{ticket.agent.first_name} {ticket.agent.last_name}"
+            agent_name = agent_names.get(ticket.agent_id)
+            if agent_name is None:
+                agent_name = agent_names[ticket.agent_id] = f"{ticket.agent.first_name} {ticket.agent.last_name}"
             citizen_name = f"{ticket.citizen.first_name} {ticket.citizen.last_name}"
             created = ticket.created_at.strftime("%m/%d") if ticket.created_at else "N/A"
             
-            print(f"{ticket.ticket_number:<12} {agent_name:<15} {citizen_name:<20} {ticket.status:<12} {created:<10}")
+            lines.append(f"{ticket.ticket_number:<12} {agent_name:<15} {citizen_name:<20} {ticket.status:<12} {created:<10}")
             
             # Count statuses
             status_counts[ticket.status] = status_counts.get(ticket.status, 0) + 1
+            
+            if len(lines) >= TICKET_CHUNK_SIZE:
+                emit_lines(lines)
+                lines = []
+        emit_lines(lines)
         
         print("-" * 80)
         print(f"\n📊 STATUS SUMMARY:")
@@ -59,39 +82,53 @@ def debug_ticket_status():
         # Check what the agent call_next function would find
         print(f"\n🔍 TESTING AGENT CALL_NEXT LOGIC:")
         
+        # Per-agent counts for every callable status in one grouped query
+        callable_statuses = ['assigned', 'waiting', 'in_progress']
+        per_agent = {}
+        for agent_id, status, count in db.session.query(
+            Queue.agent_id, Queue.status, func.count(Queue.id)
+        ).filter(
+            Queue.status.in_(callable_statuses)
+        ).group_by(Queue.agent_id, Queue.status).all():
+            per_agent.setdefault(agent_id, {})[status] = count
+        
+        # Callable tickets for all agents in one query, grouped in Python;
+        # only the printed columns are fetched
+        callable_tickets = {}
+        for ticket in Queue.query.with_entities(
+            Queue.agent_id, Queue.ticket_number, Queue.status, Queue.priority_score
+        ).filter(
+            Queue.agent_id.isnot(None),
+            Queue.status.in_(callable_statuses)
+        ).all():
+            callable_tickets.setdefault(ticket.agent_id, []).append(ticket)
+        
         # Get all agents
         agents = Agent.query.all()
         
+        lines = []
         for agent in agents:
-            print(f"\n👤 Agent: {agent.first_name} {agent.last_name} (ID: {agent.id})")
-            
-            # Test OLD logic (only 'assigned')
-            old_logic_tickets = Queue.query.filter(
-                Queue.agent_id == agent.id,
-                Queue.status == 'assigned'
-            ).all()
-            
-            # Test NEW logic (assigned + waiting)
-            new_logic_tickets = Queue.query.filter(
-                Queue.agent_id == agent.id,
-                Queue.status.in_(['assigned', 'waiting'])
-            ).all()
+            lines.append(f"\n👤 Agent: {agent.first_name} {agent.last_name} (ID: {agent.id})")
             
-            # Test FULL logic (assigned + waiting + in_progress)
-            full_logic_tickets = Queue.query.filter(
-                Queue.agent_id == agent.id,
-                Queue.status.in_(['assigned', 'waiting', 'in_progress'])
-            ).all()
+            counts = per_agent.get(agent.id, {})
+            # OLD logic: only 'assigned'
+            old_logic_count = counts.get('assigned', 0)
+            # NEW logic: assigned + waiting
+            new_logic_count = old_logic_count + counts.get('waiting', 0)
+            # FULL logic: assigned + waiting + in_progress
+            full_logic_count = new_logic_count + counts.get('in_progress', 0)
             
-            print(f"  📋 Tickets found by different logic:")
-            print(f"    - OLD (only 'assigned'): {len(old_logic_tickets)} tickets")
-            print(f"    - NEW (assigned + waiting): {len(new_logic_tickets)} tickets")  
-            print(f"    - FULL (assigned + waiting + in_progress): {len(full_logic_tickets)} tickets")
+            lines.append(f"  📋 Tickets found by different logic:")
+            lines.append(f"    - OLD (only 'assigned'): {old_logic_count} tickets")
+            lines.append(f"    - NEW (assigned + waiting): {new_logic_count} tickets")
+            lines.append(f"    - FULL (assigned + waiting + in_progress): {full_logic_count} tickets")
             
+            full_logic_tickets = callable_tickets.get(agent.id, [])
             if full_logic_tickets:
-                print(f"  📝 Tickets this agent can call:")
+                lines.append(f"  📝 Tickets this agent can call:")
                 for ticket in full_logic_tickets:
-                    print(f"    - #{ticket.ticket_number}: {ticket.status} (Priority: {ticket.priority_score})")
+                    lines.append(f"    - #{ticket.ticket_number}: {ticket.status} (Priority: {ticket.priority_score})")
+        emit_lines(lines)
 
 if __name__ == "__main__":
     try:
@@ -6,6 +6,7 @@ This script updates existing tickets to use the new status system.
 Run this script to fix tickets that were assigned before the new 'assigned' status was implemented.
 """
 
+import argparse
 import sys
 import os
 from datetime import datetime
@@ -15,12 +16,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from app import create_app
 from app.models import db, Queue, Agent
+from sqlalchemy import update
 
-def fix_legacy_tickets():
+# Tickets listed in the confirmation preview unless --verbose is given
+PREVIEW_LIMIT = 20
+
+def fix_legacy_tickets(app, verbose=False):
     """Fix legacy tickets that have agent_id but wrong status"""
     
-    app = create_app()
-    
     with app.app_context():
         print("🔍 Scanning for legacy tickets that need status updates...")
         
@@ -39,9 +42,12 @@ def fix_legacy_tickets():
         
         # Show details of what will be updated
         print("\n📋 Tickets to be updated:")
-        for ticket in legacy_tickets:
+        preview = legacy_tickets if verbose else legacy_tickets[:PREVIEW_LIMIT]
+        for ticket in preview:
             agent_name = f"{ticket.agent.first_name} {ticket.agent.last_name}" if ticket.agent else "Unknown"
             print(f"  - Ticket #{ticket.ticket_number}: {ticket.status} → assigned (Agent: {agent_name})")
+        if len(preview) < len(legacy_tickets):
+            print(f"  ... and {len(legacy_tickets) - len(preview)} more (use --verbose to list all)")
         
         # Ask for confirmation
         response = input(f"\n❓ Update {len(legacy_tickets)} tickets? (y/N): ").strip().lower()
@@ -50,22 +56,30 @@ def fix_legacy_tickets():
             print("❌ Migration cancelled by user")
             return
         
-        # Update the tickets
-        updated_count = 0
-        for ticket in legacy_tickets:
-            if ticket.status == 'waiting':
-                # Tickets that are waiting but have an agent should be 'assigned'
-                ticket.status = 'assigned'
-                ticket.updated_at = datetime.utcnow()
-                updated_count += 1
-                print(f"  ✅ Updated ticket #{ticket.ticket_number}: waiting → assigned")
-            
-            elif ticket.status == 'in_progress' and not ticket.called_at:
-                # Tickets that are 'in_progress' but never called should be 'assigned'
-                ticket.status = 'assigned'
-                ticket.updated_at = datetime.utcnow()
-                updated_count += 1
-                print(f"  ✅ Updated ticket #{ticket.ticket_number}: in_progress → assigned")
+        # Update the tickets with two set-based UPDATEs rather than one
+        # UPDATE per loaded ticket
+        now = datetime.utcnow()
+        legacy_filter = (Queue.agent_id.isnot(None), Queue.completed_at.is_(None))
+        
+        # Tickets that are waiting but have an agent should be 'assigned'
+        waiting_result = db.session.execute(
+            update(Queue)
+            .where(*legacy_filter, Queue.status == 'waiting')
+            .values(status='assigned', updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        print(f"  ✅ Updated {waiting_result.rowcount} tickets: waiting → assigned")
+        
+        # Tickets that are 'in_progress' but never called should be 'assigned'
+        in_progress_result = db.session.execute(
+            update(Queue)
+            .where(*legacy_filter, Queue.status == 'in_progress', Queue.called_at.is_(None))
+            .values(status='assigned', updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        print(f"  ✅ Updated {in_progress_result.rowcount} tickets: in_progress → assigned")
+        
+        updated_count = waiting_result.rowcount + in_progress_result.rowcount
         
         # Commit changes
         try:
@@ -87,11 +101,9 @@ def fix_legacy_tickets():
         
         return True
 
-def verify_migration():
+def verify_migration(app):
     """Verify that the migration was successful"""
     
-    app = create_app()
-    
     with app.app_context():
         print("\n🔍 Verifying migration results...")
         
@@ -117,13 +129,19 @@ def verify_migration():
             print(f"⚠️  {remaining_legacy} legacy tickets still need attention")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move legacy agent-assigned tickets to the 'assigned' status")
+    parser.add_argument('--verbose', action='store_true', help="list every ticket in the preview")
+    args = parser.parse_args()
+    
     print("🚀 CNI Queue Management System - Legacy Ticket Status Migration")
     print("=" * 60)
     
     try:
-        success = fix_legacy_tickets()
+        # Build the app once and share it between migration and verification
+        app = create_app()
+        success = fix_legacy_tickets(app, verbose=args.verbose)
         if success:
-            verify_migration()
+            verify_migration(app)
     except Exception as e:
         print(f"❌ Migration failed: {str(e)}")
         sys.exit(1)
@@ -14,6 +14,8 @@ def main():
     try:
         from app import create_app, db
         from app.models import Queue, Agent
+        from sqlalchemy import func, update
+        from sqlalchemy.orm import joinedload
         
         app = create_app()
         
@@ -22,42 +24,31 @@ def main():
             print("=" * 40)
             
             # Find tickets marked as no_show that have agents assigned
-            no_show_with_agents = Queue.query.filter(
+            no_show_with_agents = Queue.query.options(joinedload(Queue.agent)).filter(
                 Queue.status == 'no_show',
                 Queue.agent_id.isnot(None)
             ).all()
             
             print(f"Found {len(no_show_with_agents)} no_show tickets with agents assigned")
             
-            fixed_count = 0
             for ticket in no_show_with_agents:
-                agent = Agent.query.get(ticket.agent_id)
+                agent = ticket.agent
                 agent_name = f"{agent.first_name} {agent.last_name}" if agent else "Unknown"
                 
                 print(f"\n🎫 Fixing ticket {ticket.ticket_number}")
                 print(f"   Assigned to: {agent_name}")
                 print(f"   Current status: {ticket.status}")
-                
-                # Restore to in_progress status since they were assigned
-                ticket.status = 'in_progress'
-                ticket.updated_at = datetime.utcnow()
-                
-                print(f"   ✅ Changed to: {ticket.status}")
-                fixed_count += 1
             
-            # Also check for any no_show tickets from Marie Kouassi specifically
-            marie = Agent.query.filter_by(employee_id='AGT001').first()
-            if marie:
-                marie_no_show = Queue.query.filter(
-                    Queue.status == 'no_show',
-                    Queue.agent_id == marie.id
-                ).all()
-                
-                print(f"\n👤 Marie Kouassi specific tickets marked as no_show: {len(marie_no_show)}")
-                for ticket in marie_no_show:
-                    print(f"   - {ticket.ticket_number}: Restoring to in_progress")
-                    ticket.status = 'in_progress'
-                    ticket.updated_at = datetime.utcnow()
+            # Restore every assigned no_show ticket to in_progress in one
+            # UPDATE; this also covers Marie Kouassi's tickets
+            now = datetime.utcnow()
+            result = db.session.execute(
+                update(Queue)
+                .where(Queue.status == 'no_show', Queue.agent_id.isnot(None))
+                .values(status='in_progress', updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            fixed_count = result.rowcount
             
             if fixed_count > 0:
                 db.session.commit()
@@ -67,10 +58,13 @@ def main():
             
             # Show current state
             print(f"\n📊 CURRENT SYSTEM STATE:")
-            waiting = Queue.query.filter_by(status='waiting').count()
-            in_progress = Queue.query.filter_by(status='in_progress').count()
-            no_show = Queue.query.filter_by(status='no_show').count()
-            completed = Queue.query.filter_by(status='completed').count()
+            status_counts = dict(
+                db.session.query(Queue.status, func.count(Queue.id)).group_by(Queue.status).all()
+            )
+            waiting = status_counts.get('waiting', 0)
+            in_progress = status_counts.get('in_progress', 0)
+            no_show = status_counts.get('no_show', 0)
+            completed = status_counts.get('completed', 0)
             
             print(f"   Waiting: {waiting}")
             print(f"   In Progress: {in_progress}")
@@ -78,6 +72,7 @@ def main():
             print(f"   Completed: {completed}")
             
             # Show Marie's tickets specifically
+            marie = Agent.query.filter_by(employee_id='AGT001').first()
             if marie:
                 marie_tickets = Queue.query.filter_by(agent_id=marie.id).all()
                 print(f"\n👤 Marie Kouassi's tickets: {len(marie_tickets)}")
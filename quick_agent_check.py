@@ -14,38 +14,34 @@ def main():
     try:
         from app import create_app, db
         from app.models import Agent
-        from werkzeug.security import check_password_hash
+        from sqlalchemy import func
+        from utils.verify_logins import verify_logins
         
         print("🔍 Quick Agent Database Check")
         print("=" * 40)
         
         # Create app with minimal configuration
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
-            # Get all agents
-            agents = Agent.query.all()
+            # Agent counts per (role, status), aggregated in SQL
+            stats = db.session.query(
+                Agent.role, Agent.status, func.count(Agent.id)
+            ).group_by(Agent.role, Agent.status).all()
+            total_count = sum(count for _, _, count in stats)
             
-            if not agents:
+            if not total_count:
                 print("❌ No agents found in database!")
                 print("\n💡 Run: python create_admin_user.py")
                 return
             
-            print(f"📊 Found {len(agents)} agents:")
+            print(f"📊 Found {total_count} agents:")
             print()
             
-            # Test login credentials
-            test_credentials = [
-                ('ADMIN001', 'admin123'),
-                ('AGENT001', 'agent123'),
-                ('AGENT002', 'agent123'),
-                ('AGENT003', 'agent123')
-            ]
-            
-            for emp_id, password in test_credentials:
-                agent = Agent.query.filter_by(employee_id=emp_id).first()
+            # Test login credentials (all test accounts fetched in one query)
+            for emp_id, password, agent, works in verify_logins():
                 if agent:
-                    if agent.password_hash and check_password_hash(agent.password_hash, password):
+                    if works:
                         status_icon = "🟢" if agent.status == 'available' else "🟡"
                         print(f"  {status_icon} {emp_id} / {password} - ✅ LOGIN WORKS ({agent.role})")
                     else:
@@ -54,9 +50,9 @@ def main():
                     print(f"  ⚪ {emp_id} - ❌ NOT FOUND")
             
             print(f"\n📋 Summary:")
-            admin_count = len([a for a in agents if a.role == 'admin'])
-            agent_count = len([a for a in agents if a.role == 'agent'])
-            available_count = len([a for a in agents if a.status == 'available'])
+            admin_count = sum(count for role, _, count in stats if role == 'admin')
+            agent_count = sum(count for role, _, count in stats if role == 'agent')
+            available_count = sum(count for _, status, count in stats if status == 'available')
             
             print(f"  👑 Admins: {admin_count}")
             print(f"  👷 Agents: {agent_count}")
@@ -15,7 +15,7 @@ def main():
         from app import create_app, db
         from app.models import Queue, Citizen, ServiceType
         
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
             print("🔧 QUICK FIXES")
@@ -27,16 +27,17 @@ def main():
             service = ServiceType.query.first()
             
             if citizen and service:
-                for i in range(3):
-                    ticket = Queue(
-                        ticket_number=f"QUICK{i+1:03d}",
-                        citizen_id=citizen.id,
-                        service_type_id=service.id,
-                        status='waiting',
-                        priority_score=500 + i*50
-                    )
-                    db.session.add(ticket)
-                
+                rows = [
+                    {
+                        'ticket_number': f"QUICK{i+1:03d}",
+                        'citizen_id': citizen.id,
+                        'service_type_id': service.id,
+                        'status': 'waiting',
+                        'priority_score': 500 + i*50
+                    }
+                    for i in range(3)
+                ]
+                db.session.execute(Queue.__table__.insert(), rows)
                 db.session.commit()
                 print("✅ Created 3 test tickets")
             
@@ -13,13 +13,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 def main():
     try:
         from app import create_app, db
-        from app.models import Agent
+        from app.models import Agent, hash_password
+        from app.utils.encryption import encryption
         
         print("🔄 Quick Agent Reset")
         print("=" * 30)
         
         # Create app
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
             # Show current agents
@@ -35,10 +36,8 @@ def main():
                     print("❌ Operation cancelled")
                     return
                 
-                # Delete all agents
+                # Delete all agents (committed together with the inserts below)
                 Agent.query.delete()
-                db.session.commit()
-                print("✅ All agents deleted")
             
             # Create 4 new agents
             agents_data = [
@@ -82,31 +81,36 @@ def main():
             
             print(f"\n🏗️  Creating {len(agents_data)} new agents...")
             
+            # Encrypt emails and hash each distinct password once up front,
+            # then insert every agent with a single Core executemany
+            password_hashes = {}
+            rows = []
             for agent_data in agents_data:
-                try:
-                    agent = Agent(
-                        employee_id=agent_data['employee_id'],
-                        first_name=agent_data['first_name'],
-                        last_name=agent_data['last_name'],
-                        role=agent_data['role'],
-                        status=agent_data['status'],
-                        is_active=True
-                    )
-                    
-                    # Set email and password
-                    agent.email = agent_data['email']
-                    agent.set_password(agent_data['password'])
-                    
-                    db.session.add(agent)
-                    print(f"  ✅ {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']}")
-                    
-                except Exception as e:
-                    print(f"  ❌ Error creating {agent_data['employee_id']}: {e}")
-                    db.session.rollback()
-                    return
+                password = agent_data['password']
+                if password not in password_hashes:
+                    password_hashes[password] = hash_password(password)
+                rows.append({
+                    'employee_id': agent_data['employee_id'],
+                    'first_name': agent_data['first_name'],
+                    'last_name': agent_data['last_name'],
+                    'email': encryption.encrypt(agent_data['email']),
+                    'role': agent_data['role'],
+                    'status': agent_data['status'],
+                    'is_active': True,
+                    'password_hash': password_hashes[password]
+                })
             
-            # Commit all changes
-            db.session.commit()
+            # Commit the delete and inserts as one transaction
+            try:
+                db.session.execute(Agent.__table__.insert(), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            if existing_agents:
+                print("✅ All agents deleted")
+            for agent_data in agents_data:
+                print(f"  ✅ {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']}")
             print(f"\n✅ Successfully created all agents!")
             
             # Show login credentials
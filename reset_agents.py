@@ -4,7 +4,111 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
 
 from app import create_app, db
-from app.models import Agent
+from app.models import Agent, hash_password
+from app.utils.encryption import encryption
+
+# Default accounts created by the reset and seed options
+DEFAULT_AGENTS = [
+    {
+        'employee_id': 'ADMIN001',
+        'first_name': 'Admin',
+        'last_name': 'User',
+        'email': 'admin@cni.com',
+        'role': 'admin',
+        'status': 'available',
+        'password': 'admin123'
+    },
+    {
+        'employee_id': 'AGENT001',
+        'first_name': 'Marie',
+        'last_name': 'Dubois',
+        'email': 'marie.dubois@cni.com',
+        'role': 'agent',
+        'status': 'available',
+        'password': 'agent123'
+    },
+    {
+        'employee_id': 'AGENT002',
+        'first_name': 'Pierre',
+        'last_name': 'Martin',
+        'email': 'pierre.martin@cni.com',
+        'role': 'agent',
+        'status': 'available',
+        'password': 'agent123'
+    },
+    {
+        'employee_id': 'AGENT003',
+        'first_name': 'Sophie',
+        'last_name': 'Bernard',
+        'email': 'sophie.bernard@cni.com',
+        'role': 'agent',
+        'status': 'available',
+        'password': 'agent123'
+    }
+]
+
+def _agent_rows(agents):
+    """Plain agent rows for Core inserts
+
+    Core bypasses the model setters, so the email is encrypted and each
+    distinct password hashed (once) here.
+    """
+    password_hashes = {}
+    rows = []
+    for agent_data in agents:
+        password = agent_data['password']
+        if password not in password_hashes:
+            password_hashes[password] = hash_password(password)
+        rows.append({
+            'employee_id': agent_data['employee_id'],
+            'first_name': agent_data['first_name'],
+            'last_name': agent_data['last_name'],
+            'email': encryption.encrypt(agent_data['email']),
+            'role': agent_data['role'],
+            'status': agent_data['status'],
+            'is_active': True,
+            'password_hash': password_hashes[password]
+        })
+    return rows
+
+def _upsert_agents_statement(rows):
+    """INSERT ... ON CONFLICT (employee_id) DO UPDATE for rows
+
+    PostgreSQL and SQLite share the on_conflict_do_update API; other
+    dialects raise NotImplementedError.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Agent upsert is not supported on {dialect}")
+    
+    stmt = insert(Agent.__table__).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=['employee_id'],
+        set_={
+            column: stmt.excluded[column]
+            for column in ('first_name', 'last_name', 'email', 'role', 'status', 'is_active', 'password_hash')
+        }
+    )
+
+def seed_agents(app):
+    """Create or refresh the default agents in place, without deleting anyone"""
+    with app.app_context():
+        print(f"🌱 Seeding {len(DEFAULT_AGENTS)} default agents...")
+        try:
+            db.session.execute(_upsert_agents_statement(_agent_rows(DEFAULT_AGENTS)))
+            db.session.commit()
+        except Exception as e:
+            print(f"❌ Error seeding agents: {str(e)}")
+            db.session.rollback()
+            return
+        
+        for agent_data in DEFAULT_AGENTS:
+            print(f"  ✅ {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']} ({agent_data['role']})")
+        print("\n✅ Default agents are in place; other agents were left untouched.")
 
 def reset_agents(app):
     with app.app_context():
@@ -20,88 +124,25 @@ def reset_agents(app):
         print(f"\n⚠️  Found {len(existing_agents)} existing agents.")
         response = input("Do you want to DELETE ALL existing agents and create fresh ones? (yes/no): ").lower().strip()
         
-        if response in ['yes', 'y']:
-            # Delete all existing agents
-            Agent.query.delete()
-            db.session.commit()
-            print("✅ All existing agents deleted.")
-        else:
+        if response not in ['yes', 'y']:
             print("❌ Operation cancelled. Existing agents preserved.")
             return
         
-        # Create 4 new agents with proper structure
-        agents_to_create = [
-            {
-                'employee_id': 'ADMIN001',
-                'first_name': 'Admin',
-                'last_name': 'User',
-                'email': 'admin@cni.com',
-                'role': 'admin',
-                'status': 'available',
-                'password': 'admin123'
-            },
-            {
-                'employee_id': 'AGENT001',
-                'first_name': 'Marie',
-                'last_name': 'Dubois',
-                'email': 'marie.dubois@cni.com',
-                'role': 'agent',
-                'status': 'available',
-                'password': 'agent123'
-            },
-            {
-                'employee_id': 'AGENT002',
-                'first_name': 'Pierre',
-                'last_name': 'Martin',
-                'email': 'pierre.martin@cni.com',
-                'role': 'agent',
-                'status': 'available',
-                'password': 'agent123'
-            },
-            {
-                'employee_id': 'AGENT003',
-                'first_name': 'Sophie',
-                'last_name': 'Bernard',
-                'email': 'sophie.bernard@cni.com',
-                'role': 'agent',
-                'status': 'available',
-                'password': 'agent123'
-            }
-        ]
+        agents_to_create = DEFAULT_AGENTS
         
         print(f"\n🏗️  Creating {len(agents_to_create)} new agents...")
         
-        for agent_data in agents_to_create:
-            try:
-                # Create agent instance
-                agent = Agent(
-                    employee_id=agent_data['employee_id'],
-                    first_name=agent_data['first_name'],
-                    last_name=agent_data['last_name'],
-                    role=agent_data['role'],
-                    status=agent_data['status'],
-                    is_active=True
-                )
-                
-                # Set email using property setter (handles encryption)
-                agent.email = agent_data['email']
-                
-                # Set password
-                agent.set_password(agent_data['password'])
-                
-                # Add to session
-                db.session.add(agent)
-                
-                print(f"  ✅ Created: {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']} ({agent_data['role']})")
-                
-            except Exception as e:
-                print(f"  ❌ Error creating {agent_data['employee_id']}: {str(e)}")
-                db.session.rollback()
-                return
+        rows = _agent_rows(agents_to_create)
         
-        # Commit all changes
+        # Delete and re-insert in one transaction: a single commit, and a
+        # failure rolls back to the original agents
         try:
+            Agent.query.delete()
+            db.session.execute(Agent.__table__.insert(), rows)
             db.session.commit()
+            print("✅ All existing agents deleted.")
+            for agent_data in agents_to_create:
+                print(f"  ✅ Created: {agent_data['employee_id']} - {agent_data['first_name']} {agent_data['last_name']} ({agent_data['role']})")
             print(f"\n✅ Successfully created all {len(agents_to_create)} agents!")
         except Exception as e:
             print(f"\n❌ Error committing agents to database: {str(e)}")
@@ -147,17 +188,20 @@ def list_agents_only(app):
                 print()
 
 if __name__ == '__main__':
-    app = create_app()
+    app = create_app(minimal=True)
     
     print("🏢 CNI Agent Management System")
     print("1. List existing agents")
     print("2. Reset all agents (delete and recreate)")
+    print("3. Seed default agents (create or update, no delete)")
     
-    choice = input("\nEnter your choice (1 or 2): ").strip()
+    choice = input("\nEnter your choice (1, 2 or 3): ").strip()
     
     if choice == '1':
         list_agents_only(app)
     elif choice == '2':
         reset_agents(app)
+    elif choice == '3':
+        seed_agents(app)
     else:
         print("Invalid choice. Exiting.")
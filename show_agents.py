@@ -9,18 +9,30 @@ import sys
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-def main():
+def main(show_contact=False):
     try:
         from app import create_app, db
-        from app.models import Agent
+        from app.models import Agent, Queue
+        from sqlalchemy import func
+        from sqlalchemy.orm import load_only, raiseload
         
         print("👥 CNI Queue Management System - Agent Directory")
         print("=" * 60)
         
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
-            agents = Agent.query.all()
+            # The listing reads columns only; raiseload makes any future
+            # relationship access fail loudly instead of lazy-loading per agent.
+            # The encrypted contact columns are only loaded (and decrypted)
+            # with --contact.
+            columns = [
+                Agent.id, Agent.employee_id, Agent.first_name, Agent.last_name,
+                Agent.status, Agent.is_active, Agent.role, Agent.current_station_id
+            ]
+            if show_contact:
+                columns += [Agent._email, Agent._phone]
+            agents = Agent.query.options(load_only(*columns), raiseload('*')).all()
             
             if not agents:
                 print("❌ No agents found in the system")
@@ -29,28 +41,31 @@ def main():
             print(f"📊 Total Agents: {len(agents)}")
             print()
             
+            # Ticket counts for every agent in one grouped query
+            ticket_counts = {
+                (agent_id, status): count
+                for agent_id, status, count in db.session.query(
+                    Queue.agent_id, Queue.status, func.count(Queue.id)
+                ).filter(
+                    Queue.status.in_(['in_progress', 'waiting'])
+                ).group_by(Queue.agent_id, Queue.status)
+            }
+            
             for i, agent in enumerate(agents, 1):
                 print(f"👤 Agent #{i}")
                 print(f"   Name: {agent.first_name} {agent.last_name}")
                 print(f"   Login ID: {agent.employee_id}")
-                print(f"   Email: {agent.email if agent.email else 'Not set'}")
-                print(f"   Phone: {agent.phone if agent.phone else 'Not set'}")
+                if show_contact:
+                    print(f"   Email: {agent.email if agent.email else 'Not set'}")
+                    print(f"   Phone: {agent.phone if agent.phone else 'Not set'}")
                 print(f"   Status: {agent.status}")
                 print(f"   Active: {'Yes' if agent.is_active else 'No'}")
                 print(f"   Role: {agent.role}")
                 print(f"   Station ID: {agent.current_station_id if agent.current_station_id else 'Not assigned'}")
                 
                 # Check if they have any active tickets
-                from app.models import Queue
-                active_tickets = Queue.query.filter_by(
-                    agent_id=agent.id,
-                    status='in_progress'
-                ).count()
-                
-                waiting_tickets = Queue.query.filter_by(
-                    agent_id=agent.id,
-                    status='waiting'
-                ).count()
+                active_tickets = ticket_counts.get((agent.id, 'in_progress'), 0)
+                waiting_tickets = ticket_counts.get((agent.id, 'waiting'), 0)
                 
                 print(f"   Current Tickets: {active_tickets} in progress, {waiting_tickets} waiting")
                 print(f"   Database ID: {agent.id}")
@@ -89,4 +104,4 @@ def main():
         traceback.print_exc()
 
 if __name__ == '__main__':
-    main()
+    main(show_contact='--contact' in sys.argv[1:])
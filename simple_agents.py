@@ -13,24 +13,33 @@ def main():
     try:
         from app import create_app, db
         from app.models import Agent, Queue
+        from sqlalchemy import func
         
-        app = create_app()
+        app = create_app(minimal=True)
         
         with app.app_context():
             print("🔑 AGENT LOGIN CREDENTIALS")
             print("=" * 40)
             
-            agents = Agent.query.filter_by(is_active=True).all()
+            # Plain rows of just the printed columns; the is_active filter is
+            # served by idx_agents_active_status (is_active, status)
+            agents = db.session.query(
+                Agent.id, Agent.employee_id, Agent.first_name, Agent.last_name, Agent.status
+            ).filter(Agent.is_active.is_(True)).all()
+            
+            # In-progress ticket counts for all agents in one grouped query
+            try:
+                active_counts = dict(
+                    db.session.query(Queue.agent_id, func.count(Queue.id))
+                    .filter(Queue.status == 'in_progress')
+                    .group_by(Queue.agent_id)
+                    .all()
+                )
+            except:
+                active_counts = {}
             
             for agent in agents:
-                # Get ticket counts without causing errors
-                try:
-                    active_tickets = Queue.query.filter_by(
-                        agent_id=agent.id,
-                        status='in_progress'
-                    ).count()
-                except:
-                    active_tickets = 0
+                active_tickets = active_counts.get(agent.id, 0)
                 
                 print(f"👤 {agent.first_name} {agent.last_name}")
                 print(f"   Login ID: {agent.employee_id}")
@@ -1,25 +1,140 @@
+import functools
+import importlib
+import itertools
 import os
-from flask import Flask, request
+from flask import Flask, request, g
 from dotenv import load_dotenv
 from .config import Config
 from .extensions import db, jwt, migrate, socketio, csrf, login_manager, queue_scheduler
 from datetime import datetime
 from flask_cors import CORS
 
-def create_app(config_class=Config):
-    """Create and configure an instance of the Flask application."""
+# .flaskenv at the repo root and .env under src/
+_ENV_FILES = (
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.flaskenv'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.env'),
+)
+
+def _env_mtimes():
+    """Modification times of the env files (None for a missing file)"""
+    mtimes = []
+    for path in _ENV_FILES:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+@functools.lru_cache(maxsize=1)
+def _load_env(mtimes):
+    """Load the env files; cached, so repeat factory calls skip the parse
+    until one of the files changes"""
+    for path in _ENV_FILES:
+        load_dotenv(path)
+
+# Paths whose auth failures get a JSON 401 instead of a login redirect
+_API_PREFIXES = ('/api/', '/kiosk/')
+
+# Per-process request counter; with the pid it forms a cheap unique request id
+_request_ids = itertools.count(1)
+
+# timeago filter units, largest first: (seconds per unit, singular, plural)
+TIMEAGO_UNITS = (
+    (86400, 'day', 'days'),
+    (3600, 'hour', 'hours'),
+    (60, 'minute', 'minutes'),
+)
+
+# (module, blueprint attribute, url_prefix), in registration order
+BLUEPRINTS = [
+    ('.auth.routes', 'auth_bp', '/auth'),
+    ('.api.routes', 'api_bp', '/api'),
+    ('.main.routes', 'main_bp', None),
+    ('.kiosk', 'kiosk_bp', '/kiosk'),
+    ('.api.performance', 'performance_bp', '/api/performance'),
+    ('.api.advanced_priority', 'advanced_priority_bp', '/api/advanced_priority'),
+    ('.api.position_api', 'position_api_bp', '/api/position'),
+    ('.api.monitoring_api', 'monitoring_api_bp', '/api/monitoring'),
+    ('.api.config_api', 'config_api_bp', '/api/config'),
+    ('.routes.user', 'user_bp', '/user'),
+    ('.routes.admin', 'admin_bp', None),
+    ('.routes.agent', 'agent_bp', None),
+]
+
+def create_app(config_class=Config, minimal=False):
+    """Create and configure an instance of the Flask application.
+
+    With ``minimal=True`` only SQLAlchemy is bound: Socket.IO, auth,
+    blueprints and the background services (scheduler, metrics collector,
+    position tracker) are skipped. CLI and seed scripts that just need ORM
+    access use this to avoid the full cold start.
+    """
     # Load environment variables from .flaskenv and .env
-    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.flaskenv'))
-    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.env'))
+    _load_env(_env_mtimes())
 
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(config_class)
+    # orjson-backed jsonify for the API responses
+    from .utils.json_provider import ORJSONProvider
+    app.json = ORJSONProvider(app)
+
+    # Page multi-row INSERTs (insertmanyvalues) so bulk seeding is chunked
+    # instead of sent as one giant statement. SQLite limits bound parameters
+    # per statement, so keep its pages at 500 rows or fewer.
+    engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    database_uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    engine_options.setdefault(
+        'insertmanyvalues_page_size',
+        500 if database_uri.startswith('sqlite') else 10000
+    )
+    # Keep a warm, health-checked connection pool on server databases;
+    # LIFO reuse lets idle surplus connections age out via pool_recycle
+    if not database_uri.startswith('sqlite'):
+        engine_options.setdefault('pool_size', 25)
+        engine_options.setdefault('max_overflow', 25)
+        engine_options.setdefault('pool_pre_ping', True)
+        engine_options.setdefault('pool_recycle', 1800)
+        engine_options.setdefault('pool_use_lifo', True)
+    if database_uri.startswith('postgres'):
+        connect_args = {'application_name': 'cni-queue'}
+        # Opt-in cap on statement run time, in milliseconds. Off by default:
+        # it applies to every connection, migrations and reports included
+        statement_timeout = (app.config.get('DATABASE_STATEMENT_TIMEOUT_MS')
+                             or os.environ.get('DATABASE_STATEMENT_TIMEOUT_MS'))
+        if statement_timeout:
+            connect_args['options'] = f'-c statement_timeout={int(statement_timeout)}'
+        engine_options.setdefault('connect_args', connect_args)
+    # psycopg2 (the default PostgreSQL driver) can also batch executemany
+    # UPDATE/DELETE; INSERTs are already paged by insertmanyvalues above
+    if database_uri.split('://', 1)[0] in ('postgres', 'postgresql', 'postgresql+psycopg2'):
+        engine_options.setdefault('executemany_mode', 'values_plus_batch')
+        engine_options.setdefault('executemany_batch_page_size', 500)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # Test-only password hashing work factor (see models.hash_password);
+    # ignored unless app.testing is true
+    if os.environ.get('CREDENTIAL_ROUNDS'):
+        app.config.setdefault('CREDENTIAL_ROUNDS', int(os.environ['CREDENTIAL_ROUNDS']))
 
     # Initialize extensions with the app
     db.init_app(app)
+
+    if minimal:
+        with app.app_context():
+            from . import models
+        return app
+
     migrate.init_app(app, db)
     jwt.init_app(app)
-    socketio.init_app(app, cors_allowed_origins="*")
+    # With REDIS_URL set, emits go through a Redis message queue so every
+    # worker (and background jobs) can broadcast; SOCKETIO_ASYNC_MODE picks
+    # eventlet/gevent for deployments run under those gunicorn workers
+    socketio.init_app(
+        app,
+        cors_allowed_origins="*",
+        async_mode=os.environ.get('SOCKETIO_ASYNC_MODE') or None,
+        message_queue=os.environ.get('REDIS_URL') or None
+    )
     
     # Socket.IO event handlers for real-time queue updates
     @socketio.on('connect')
@@ -29,21 +144,21 @@ def create_app(config_class=Config):
     @socketio.on('disconnect')
     def handle_disconnect():
         print('Client disconnected')
-    
-    # Function to emit queue updates
-    def emit_queue_update(queue_data):
-        socketio.emit('queue_update', queue_data, broadcast=True)
+
     CORS(app, supports_credentials=True)
     csrf.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login_page'
     login_manager.login_message = 'Please log in to access this page.'
     
-    # User loader callback for Flask-Login
+    # User loader callback for Flask-Login; Agent is imported once here
+    # rather than on every authenticated request
+    from .models import Agent
+    
     @login_manager.user_loader
     def load_user(user_id):
-        from .models import Agent
-        return Agent.query.get(int(user_id))
+        # Session.get checks the identity map before emitting a SELECT
+        return db.session.get(Agent, int(user_id))
 
     # JWT Error Handlers
     from flask import redirect, url_for, request, jsonify
@@ -52,21 +167,21 @@ def create_app(config_class=Config):
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
         """Redirect to login page when token is expired"""
-        if request.is_json or request.path.startswith('/api/') or request.path.startswith('/kiosk/'):
+        if request.is_json or request.path.startswith(_API_PREFIXES):
             return jsonify({'message': 'Token has expired', 'error': 'token_expired'}), 401
         return redirect(url_for('auth.login_page'))
     
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
         """Redirect to login page when token is invalid"""
-        if request.is_json or request.path.startswith('/api/') or request.path.startswith('/kiosk/'):
+        if request.is_json or request.path.startswith(_API_PREFIXES):
             return jsonify({'message': 'Invalid token', 'error': 'invalid_token'}), 401
         return redirect(url_for('auth.login_page'))
     
     @jwt.unauthorized_loader
     def missing_token_callback(error):
         """Redirect to login page when token is missing"""
-        if request.is_json or request.path.startswith('/api/') or request.path.startswith('/kiosk/'):
+        if request.is_json or request.path.startswith(_API_PREFIXES):
             return jsonify({'message': 'Authorization token is required', 'error': 'authorization_required'}), 401
         return redirect(url_for('auth.login_page'))
 
@@ -74,75 +189,42 @@ def create_app(config_class=Config):
         # Import models here so they can be found by Alembic/Flask-Migrate
         from . import models
 
-        # Register blueprints
-        from .auth.routes import auth_bp
-        app.register_blueprint(auth_bp, url_prefix='/auth')
-
-        from .api.routes import api_bp
-        app.register_blueprint(api_bp, url_prefix='/api')
+        # Register blueprints; each module is imported only here, at
+        # registration time, so minimal boots never load them
+        for module_name, blueprint_name, url_prefix in BLUEPRINTS:
+            module = importlib.import_module(module_name, __name__)
+            app.register_blueprint(getattr(module, blueprint_name), url_prefix=url_prefix)
 
-        from .main.routes import main_bp
-        app.register_blueprint(main_bp)
-
-        from .kiosk import kiosk_bp
-        app.register_blueprint(kiosk_bp, url_prefix='/kiosk')
+        # Initialize performance monitoring after app is ready
+        from .queue_logic.performance_monitor import metrics_collector
+        metrics_collector._app = app
+        metrics_collector.start_monitoring()
         
-        from .api.performance import performance_bp
-        app.register_blueprint(performance_bp, url_prefix='/api/performance')
-
-        from .api.advanced_priority import advanced_priority_bp
-        app.register_blueprint(advanced_priority_bp, url_prefix='/api/advanced_priority')
+        # Initialize and start queue scheduler
+        from .queue_logic.scheduler import get_queue_scheduler
+        global queue_scheduler
+        queue_scheduler = get_queue_scheduler()
+        queue_scheduler.start()
         
-        from .api.position_api import position_api_bp
-        app.register_blueprint(position_api_bp, url_prefix='/api/position')
+        # Initialize position tracker for real-time updates
+        from .queue_logic.position_tracker import get_position_tracker
+        position_tracker = get_position_tracker()
+        position_tracker.refresh_positions()
         
-        from .api.monitoring_api import monitoring_api_bp
-    app.register_blueprint(monitoring_api_bp, url_prefix='/api/monitoring')
-    
-    from .api.config_api import config_api_bp
-    app.register_blueprint(config_api_bp, url_prefix='/api/config')
-    
-    from .routes.user import user_bp
-    app.register_blueprint(user_bp, url_prefix='/user')
-    
-    from .routes.admin import admin_bp
-    app.register_blueprint(admin_bp)
-    
-    from .routes.agent import agent_bp
-    app.register_blueprint(agent_bp)
-
-    # Initialize performance monitoring after app is ready
-    from .queue_logic.performance_monitor import metrics_collector
-    metrics_collector._app = app
-    metrics_collector.start_monitoring()
-    
-    # Initialize and start queue scheduler
-    from .queue_logic.scheduler import get_queue_scheduler
-    global queue_scheduler
-    queue_scheduler = get_queue_scheduler()
-    queue_scheduler.start()
-    
-    # Initialize position tracker for real-time updates
-    from .queue_logic.position_tracker import get_position_tracker
-    position_tracker = get_position_tracker()
-    position_tracker.refresh_positions()
-    
-    # Initialize transaction manager
-    from .utils.db_transaction_manager import get_transaction_manager
-    from .extensions import transaction_manager
-    global transaction_manager
-    transaction_manager = get_transaction_manager()
-    
-    # Initialize queue logger
-    from .utils.queue_logger import get_queue_logger
-    queue_logger = get_queue_logger(app)
+        # Initialize transaction manager
+        from .utils.db_transaction_manager import get_transaction_manager
+        from .extensions import transaction_manager
+        global transaction_manager
+        transaction_manager = get_transaction_manager()
+        
+        # Initialize queue logger
+        from .utils.queue_logger import get_queue_logger
+        queue_logger = get_queue_logger(app)
     
     # Setup request context for logging
     @app.before_request
     def setup_logging_context():
-        import uuid
-        from flask import g
-        g.request_id = str(uuid.uuid4())
+        g.request_id = f"{os.getpid():x}-{next(_request_ids):x}"
         g.queue_logger = queue_logger
         
         # Log request start
@@ -184,19 +266,16 @@ def create_app(config_class=Config):
         """Return time ago string for datetime"""
         if dt is None:
             return ''
-        from datetime import datetime, timedelta
-        now = datetime.utcnow()
-        diff = now - dt
+        # One clock read per request, shared by every row rendered
+        now = g.get('timeago_now')
+        if now is None:
+            now = g.timeago_now = datetime.utcnow()
+        seconds = int((now - dt).total_seconds())
         
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days != 1 else ''} ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours != 1 else ''} ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
-        else:
-            return "Just now"
+        for unit_seconds, singular, plural in TIMEAGO_UNITS:
+            if seconds >= unit_seconds:
+                count = seconds // unit_seconds
+                return f"{count} {singular if count == 1 else plural} ago"
+        return "Just now"
 
     return app
@@ -1,18 +1,42 @@
-from flask import Blueprint, request, jsonify, current_app, render_template
+from flask import Blueprint, Response, request, jsonify, current_app, render_template, url_for
 from flask_login import login_required
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
+import hashlib
+import json
 import logging
+import threading
+import uuid
 
 from ..auth.decorators import admin_required
 from ..queue_logic.advanced_priority_algorithms import (
     advanced_priority_manager, AlgorithmType, PriorityMetrics
 )
 from ..queue_logic.optimizer import hybrid_engine
-from ..models import Queue, Citizen, ServiceType
+from ..models import Agent, Queue, Citizen, ServiceType, ReorderJob
 from ..extensions import db
+from sqlalchemy import and_, case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 
 logger = logging.getLogger(__name__)
 
+# AlgorithmType lookup by value, so request validation is a dict probe
+# rather than one enum construction (and ValueError) per name
+_ALGO_BY_VALUE = {algo.value: algo for algo in AlgorithmType}
+
+# Constant 400 bodies, encoded once; each request still gets its own Response
+_MISSING_ALGOS_BODY = json.dumps({'status': 'error', 'message': 'Missing algorithms list in request'})
+_MISSING_SIMULATION_ALGOS_BODY = json.dumps({'status': 'error', 'message': 'Missing algorithms list for simulation'})
+
+# Background reorder jobs live in the reorder_jobs table so any worker can
+# report on them. A running job refreshes heartbeat_at every
+# REORDER_JOB_HEARTBEAT; one silent for REORDER_JOB_TIMEOUT is taken to have
+# died with its worker. Finished jobs are kept for REORDER_JOB_RETENTION.
+REORDER_JOB_HEARTBEAT = timedelta(seconds=15)
+REORDER_JOB_TIMEOUT = timedelta(minutes=2)
+REORDER_JOB_RETENTION = timedelta(days=1)
+
 advanced_priority_bp = Blueprint('advanced_priority', __name__, url_prefix='/api/advanced-priority')
 
 @advanced_priority_bp.route('/algorithms', methods=['GET'])
@@ -21,27 +45,24 @@ advanced_priority_bp = Blueprint('advanced_priority', __name__, url_prefix='/api
 def get_available_algorithms():
     """Get list of available advanced priority algorithms"""
     try:
+        active = [algo.value for algo in advanced_priority_manager.active_algorithms]
         algorithms = {
-            'available_algorithms': [
-                {
-                    'type': algo.value,
-                    'name': algo.value.replace('_', ' ').title(),
-                    'description': _get_algorithm_description(algo)
-                }
-                for algo in AlgorithmType
-            ],
-            'active_algorithms': [algo.value for algo in advanced_priority_manager.active_algorithms],
+            'available_algorithms': _available_algorithms(),
+            'active_algorithms': active,
             'total_available': len(AlgorithmType),
-            'total_active': len(advanced_priority_manager.active_algorithms)
+            'total_active': len(active)
         }
         
-        return jsonify({
+        # The listing is static, so only the active set can change the body
+        response = jsonify({
             'status': 'success',
             'data': algorithms
         })
+        response.set_etag(hashlib.sha1(','.join(active).encode()).hexdigest())
+        return response.make_conditional(request)
         
     except Exception as e:
-        logger.error(f"Error getting available algorithms: {e}")
+        logger.error("Error getting available algorithms: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Failed to get algorithms: {str(e)}'
@@ -56,29 +77,23 @@ def configure_algorithms():
         data = request.get_json()
         
         if not data or 'algorithms' not in data:
-            return jsonify({
-                'status': 'error',
-                'message': 'Missing algorithms list in request'
-            }), 400
+            return Response(_MISSING_ALGOS_BODY, status=400, mimetype='application/json')
         
         algorithm_names = data['algorithms']
         
         # Validate algorithm names
-        valid_algorithms = []
-        for name in algorithm_names:
-            try:
-                algo_type = AlgorithmType(name)
-                valid_algorithms.append(algo_type)
-            except ValueError:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Invalid algorithm type: {name}'
-                }), 400
+        invalid = _invalid_algorithm_names(algorithm_names)
+        if invalid:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid algorithm type: {", ".join(map(str, invalid))}'
+            }), 400
+        valid_algorithms = [_ALGO_BY_VALUE[name] for name in algorithm_names]
         
         # Configure algorithms
         advanced_priority_manager.configure_algorithms(valid_algorithms)
         
-        logger.info(f"Configured advanced algorithms: {algorithm_names}")
+        logger.info("Configured advanced algorithms: %s", algorithm_names)
         
         return jsonify({
             'status': 'success',
@@ -87,7 +102,7 @@ def configure_algorithms():
         })
         
     except Exception as e:
-        logger.error(f"Error configuring algorithms: {e}")
+        logger.error("Error configuring algorithms: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Failed to configure algorithms: {str(e)}'
@@ -101,14 +116,21 @@ def get_algorithm_metrics():
     try:
         metrics = advanced_priority_manager.get_algorithm_metrics()
         
-        # Add current queue statistics
+        # Add current queue statistics; all three counters come from one
+        # conditional-aggregate query over the matching statuses
+        now = datetime.utcnow()
+        today_start = datetime(now.year, now.month, now.day)
+        counts = db.session.query(
+            func.count(case((Queue.status == 'waiting', 1))).label('waiting'),
+            func.count(case((Queue.status == 'in_service', 1))).label('in_service'),
+            func.count(case((and_(Queue.status == 'completed', Queue.updated_at >= today_start), 1))).label('completed_today')
+        ).filter(
+            Queue.status.in_(['waiting', 'in_service', 'completed'])
+        ).one()
         current_stats = {
-            'total_waiting': Queue.query.filter_by(status='waiting').count(),
-            'total_in_service': Queue.query.filter_by(status='in_service').count(),
-            'total_completed_today': Queue.query.filter(
-                Queue.status == 'completed',
-                Queue.updated_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).count()
+            'total_waiting': counts.waiting,
+            'total_in_service': counts.in_service,
+            'total_completed_today': counts.completed_today
         }
         
         return jsonify({
@@ -130,7 +152,7 @@ def get_algorithm_metrics():
         })
         
     except Exception as e:
-        logger.error(f"Error getting algorithm metrics: {e}")
+        logger.error("Error getting algorithm metrics: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Failed to get metrics: {str(e)}'
@@ -142,10 +164,13 @@ def get_algorithm_metrics():
 def trigger_advanced_optimization():
     """Trigger advanced queue optimization"""
     try:
-        # Get current system state
-        current_waiting = Queue.query.filter_by(status='waiting').count()
+        # Only whether anything is waiting matters here, so ask EXISTS
+        # instead of counting the whole queue
+        has_waiting = db.session.query(
+            db.session.query(Queue.id).filter_by(status='waiting').exists()
+        ).scalar()
         
-        if current_waiting == 0:
+        if not has_waiting:
             return jsonify({
                 'status': 'success',
                 'message': 'No items in queue to optimize',
@@ -162,7 +187,7 @@ def trigger_advanced_optimization():
         })
         
     except Exception as e:
-        logger.error(f"Error triggering optimization: {e}")
+        logger.error("Error triggering optimization: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Failed to trigger optimization: {str(e)}'
@@ -177,25 +202,19 @@ def simulate_algorithm_performance():
         data = request.get_json()
         
         if not data or 'algorithms' not in data:
-            return jsonify({
-                'status': 'error',
-                'message': 'Missing algorithms list for simulation'
-            }), 400
+            return Response(_MISSING_SIMULATION_ALGOS_BODY, status=400, mimetype='application/json')
         
         algorithm_names = data['algorithms']
         simulation_duration = data.get('duration_minutes', 60)
         
         # Validate algorithms
-        valid_algorithms = []
-        for name in algorithm_names:
-            try:
-                algo_type = AlgorithmType(name)
-                valid_algorithms.append(algo_type)
-            except ValueError:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Invalid algorithm type: {name}'
-                }), 400
+        invalid = _invalid_algorithm_names(algorithm_names)
+        if invalid:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid algorithm type: {", ".join(map(str, invalid))}'
+            }), 400
+        valid_algorithms = [_ALGO_BY_VALUE[name] for name in algorithm_names]
         
         # Perform simulation (simplified)
         simulation_results = _simulate_algorithm_performance(
@@ -209,7 +228,7 @@ def simulate_algorithm_performance():
         })
         
     except Exception as e:
-        logger.error(f"Error in simulation: {e}")
+        logger.error("Error in simulation: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Simulation failed: {str(e)}'
@@ -219,25 +238,185 @@ def simulate_algorithm_performance():
 @login_required
 @admin_required
 def reorder_queue_advanced():
-    """Reorder queue using advanced algorithms"""
+    """Start an advanced queue reorder in the background
+    
+    Returns 202 with a job id to poll; a request made while a reorder is
+    still running joins that job instead of starting another.
+    """
     try:
-        # Get current waiting queue
-        current_queue = Queue.query.filter_by(status='waiting').order_by(
-            Queue.priority_score.desc(), Queue.created_at.asc()
-        ).all()
+        app = current_app._get_current_object()
         
-        if not current_queue:
+        _expire_reorder_jobs()
+        job, started = _claim_reorder_job()
+        if job is None:
             return jsonify({
-                'status': 'success',
-                'message': 'No items in queue to reorder',
-                'reordered_count': 0
-            })
+                'status': 'error',
+                'message': 'Another queue reorder is finishing, please retry'
+            }), 409
+        job_id = job.id
+        if started:
+            threading.Thread(target=_run_reorder_job, args=(app, job_id), daemon=True).start()
+        
+        return jsonify({
+            'status': 'accepted',
+            'message': 'Queue reorder started',
+            'job_id': job_id,
+            'status_url': url_for('advanced_priority.get_reorder_status', job_id=job_id)
+        }), 202
+        
+    except Exception as e:
+        logger.error("Error starting advanced queue reorder: %s", e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to start queue reorder: {str(e)}'
+        }), 500
+
+@advanced_priority_bp.route('/queue/reorder/status/<job_id>', methods=['GET'])
+@login_required
+@admin_required
+def get_reorder_status(job_id):
+    """Get the state and, once finished, the result of a reorder job"""
+    job = db.session.get(ReorderJob, job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown reorder job: {job_id}'
+        }), 404
+    
+    # Report a job whose worker died as failed rather than running forever
+    if job.state == 'running' and job.heartbeat_at < datetime.utcnow() - REORDER_JOB_TIMEOUT:
+        _expire_reorder_jobs()
+        db.session.refresh(job)
+    
+    return jsonify({
+        'status': 'success',
+        'job': _reorder_job_dict(job)
+    })
+
+def _reorder_job_dict(job: ReorderJob) -> dict:
+    """Status payload for a reorder job"""
+    return {
+        'job_id': job.id,
+        'state': job.state,
+        'submitted_at': job.submitted_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'result': job.result
+    }
+
+def _claim_reorder_job():
+    """Start a reorder job, or join the one already running
+    
+    Returns (job, started). Inserting into the unique active slot is the
+    lock, so two workers can never reorder the queue at the same time.
+    The running job can finish between a failed insert and the lookup, so
+    that is retried once; job is None if it lost that race twice.
+    """
+    for _ in range(2):
+        now = datetime.utcnow()
+        job = ReorderJob(id=uuid.uuid4().hex, state='running', active_slot=1,
+                         submitted_at=now, heartbeat_at=now)
+        db.session.add(job)
+        try:
+            db.session.commit()
+            return job, True
+        except IntegrityError:
+            db.session.rollback()
+        job = ReorderJob.query.filter_by(active_slot=1).first()
+        if job is not None:
+            return job, False
+    return None, False
+
+def _expire_reorder_jobs():
+    """Fail jobs orphaned by a dead worker and drop old finished ones"""
+    now = datetime.utcnow()
+    ReorderJob.query.filter(
+        ReorderJob.active_slot.isnot(None),
+        ReorderJob.heartbeat_at < now - REORDER_JOB_TIMEOUT
+    ).update({
+        'state': 'failed',
+        'active_slot': None,
+        'finished_at': now,
+        'result': {'status': 'error', 'message': 'Reorder job timed out'}
+    }, synchronize_session=False)
+    ReorderJob.query.filter(
+        ReorderJob.finished_at < now - REORDER_JOB_RETENTION
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+def _run_reorder_job(app, job_id: str):
+    """Reorder job body, run on a background thread"""
+    stop_heartbeat = threading.Event()
+    threading.Thread(target=_heartbeat_reorder_job, args=(app, job_id, stop_heartbeat),
+                     daemon=True).start()
+    
+    with app.app_context():
+        try:
+            result = _reorder_waiting_queue()
+            state = 'completed'
+        except Exception as e:
+            logger.error("Error in advanced queue reordering: %s", e)
+            db.session.rollback()
+            result = {
+                'status': 'error',
+                'message': f'Failed to reorder queue: {str(e)}'
+            }
+            state = 'failed'
+        finally:
+            stop_heartbeat.set()
         
+        # Freeing the active slot lets the next reorder start. A job already
+        # expired as orphaned keeps its failed state.
+        updated = ReorderJob.query.filter_by(id=job_id, state='running').update({
+            'state': state,
+            'result': result,
+            'finished_at': datetime.utcnow(),
+            'active_slot': None
+        }, synchronize_session=False)
+        db.session.commit()
+        if not updated:
+            logger.warning("Reorder job %s finished after it was expired", job_id)
+
+def _heartbeat_reorder_job(app, job_id: str, stop: threading.Event):
+    """Refresh a running job's heartbeat_at until stop is set"""
+    with app.app_context():
+        while not stop.wait(REORDER_JOB_HEARTBEAT.total_seconds()):
+            try:
+                ReorderJob.query.filter_by(id=job_id, state='running').update(
+                    {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+                )
+                db.session.commit()
+            except Exception as e:
+                logger.warning("Reorder job heartbeat failed: %s", e)
+                db.session.rollback()
+
+def _reorder_waiting_queue() -> dict:
+    """Reorder the waiting queue using the active advanced algorithms"""
+    # Get current waiting queue; the reordering algorithms only read
+    # these columns (plus the citizen/service_type relationships, which
+    # lazy-load through the foreign keys), so skip loading the rest
+    current_queue = Queue.query.options(
+        load_only(Queue.id, Queue.citizen_id, Queue.service_type_id,
+                  Queue.priority_score, Queue.created_at)
+    ).filter_by(status='waiting').order_by(
+        Queue.priority_score.desc(), Queue.created_at.asc()
+    ).all()
+    
+    if not current_queue:
+        return {
+            'status': 'success',
+            'message': 'No items in queue to reorder',
+            'reordered_count': 0
+        }
+    
+    # A single ticket has nothing to be reordered against
+    optimized_queue = current_queue
+    if len(current_queue) > 1:
         # Get system state
         system_state = {
             'total_waiting': len(current_queue),
-            'agents_available': db.session.query(db.func.count()).filter(
-                # Simplified agent availability check
+            'agents_available': db.session.query(func.count(Agent.id)).filter(
+                Agent.is_active.is_(True), Agent.status == 'available'
             ).scalar() or 1,
             'peak_hours': (9 <= datetime.now().hour <= 11) or (14 <= datetime.now().hour <= 16),
             'average_wait_time': 25.0  # Simplified
@@ -247,48 +426,60 @@ def reorder_queue_advanced():
         optimized_queue = advanced_priority_manager.optimize_queue_order(
             current_queue, system_state
         )
-        
-        # Update queue positions
-        reorder_count = 0
-        for index, queue_item in enumerate(optimized_queue):
-            new_priority = 1000 - index
-            if queue_item.priority_score != new_priority:
-                queue_item.priority_score = new_priority
-                queue_item.updated_at = datetime.utcnow()
-                reorder_count += 1
-        
-        if reorder_count > 0:
-            db.session.commit()
-        
-        logger.info(f"Advanced queue reordering completed: {reorder_count} items reordered")
-        
-        return jsonify({
-            'status': 'success',
-            'message': f'Queue reordered using advanced algorithms',
-            'reordered_count': reorder_count,
-            'total_items': len(current_queue),
-            'algorithms_used': [algo.value for algo in advanced_priority_manager.active_algorithms]
-        })
-        
-    except Exception as e:
-        logger.error(f"Error in advanced queue reordering: {e}")
-        db.session.rollback()
-        return jsonify({
-            'status': 'error',
-            'message': f'Failed to reorder queue: {str(e)}'
-        }), 500
+    
+    # Update queue positions: collect the changed rows and write them in
+    # one executemany UPDATE instead of flushing each dirty instance
+    now = datetime.utcnow()
+    mappings = [
+        {'id': queue_item.id, 'priority_score': 1000 - index, 'updated_at': now}
+        for index, queue_item in enumerate(optimized_queue)
+        if queue_item.priority_score != 1000 - index
+    ]
+    reorder_count = len(mappings)
+    
+    if reorder_count > 0:
+        db.session.bulk_update_mappings(Queue, mappings)
+        db.session.commit()
+    
+    logger.info("Advanced queue reordering completed: %s items reordered", reorder_count)
+    
+    return {
+        'status': 'success',
+        'message': f'Queue reordered using advanced algorithms',
+        'reordered_count': reorder_count,
+        'total_items': len(current_queue),
+        'algorithms_used': [algo.value for algo in advanced_priority_manager.active_algorithms]
+    }
+
+_ALGO_DESCRIPTIONS = {
+    AlgorithmType.ADAPTIVE_PRIORITY: "Learns from historical data to adapt priority calculations",
+    AlgorithmType.PREDICTIVE_SCHEDULING: "Predicts optimal scheduling based on patterns and forecasting",
+    AlgorithmType.FAIRNESS_WEIGHTED: "Ensures fairness across different citizen groups",
+    AlgorithmType.DYNAMIC_REORDERING: "Dynamically reorders queue based on real-time conditions",
+    AlgorithmType.MACHINE_LEARNING: "Uses machine learning for intelligent priority decisions",
+    AlgorithmType.MULTI_OBJECTIVE: "Balances multiple objectives like wait time, fairness, and throughput"
+}
 
 def _get_algorithm_description(algorithm_type: AlgorithmType) -> str:
     """Get description for algorithm type"""
-    descriptions = {
-        AlgorithmType.ADAPTIVE_PRIORITY: "Learns from historical data to adapt priority calculations",
-        AlgorithmType.PREDICTIVE_SCHEDULING: "Predicts optimal scheduling based on patterns and forecasting",
-        AlgorithmType.FAIRNESS_WEIGHTED: "Ensures fairness across different citizen groups",
-        AlgorithmType.DYNAMIC_REORDERING: "Dynamically reorders queue based on real-time conditions",
-        AlgorithmType.MACHINE_LEARNING: "Uses machine learning for intelligent priority decisions",
-        AlgorithmType.MULTI_OBJECTIVE: "Balances multiple objectives like wait time, fairness, and throughput"
-    }
-    return descriptions.get(algorithm_type, "Advanced priority algorithm")
+    return _ALGO_DESCRIPTIONS.get(algorithm_type, "Advanced priority algorithm")
+
+def _invalid_algorithm_names(algorithm_names: list) -> list:
+    """Return every entry of algorithm_names that is not an AlgorithmType value"""
+    return [name for name in algorithm_names
+            if not isinstance(name, str) or name not in _ALGO_BY_VALUE]
+
+@lru_cache(maxsize=1)
+def _available_algorithms() -> list:
+    """Static algorithm listing, built once per process"""
+    return [
+        {
+            'type': algo.value,
+            'name': algo.value.replace('_', ' ').title(),
+            'description': _get_algorithm_description(algo)
+        }
+        for algo in AlgorithmType
+    ]
 
 def _simulate_algorithm_performance(algorithms: list, duration_minutes: int) -> dict:
     """Simulate algorithm performance (simplified implementation)"""
@@ -1,24 +1,30 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..utils.config_manager import get_config_manager, get_queue_optimization_config
+from ..utils.config_manager import get_config_manager, get_queue_optimization_config_dict
 from ..utils.queue_logger import get_queue_logger
-from dataclasses import asdict
+import hashlib
 import json
 
 config_api_bp = Blueprint('config_api', __name__)
 
+# Config history paging: largest page served, and rows fetched per cursor chunk
+HISTORY_MAX_LIMIT = 1000
+HISTORY_CHUNK_SIZE = 200
+
 @config_api_bp.route('/current', methods=['GET'])
 @jwt_required()
 def get_current_config():
     """Get current queue optimization configuration"""
     try:
-        config = get_queue_optimization_config()
-        config_dict = asdict(config)
+        config_dict = get_queue_optimization_config_dict()
         
-        return jsonify({
+        # Dashboards poll this; unchanged configs get a 304
+        response = jsonify({
             'success': True,
             'configuration': config_dict
-        }), 200
+        })
+        response.set_etag(get_config_manager().get_config_etag())
+        return response.make_conditional(request)
         
     except Exception as e:
         queue_logger = get_queue_logger()
@@ -110,12 +116,12 @@ def update_config():
             })
             
             # Get updated configuration
-            updated_config = get_queue_optimization_config()
+            updated_config = get_queue_optimization_config_dict()
             
             return jsonify({
                 'success': True,
                 'message': 'Configuration updated successfully',
-                'updated_configuration': asdict(updated_config)
+                'updated_configuration': updated_config
             }), 200
         else:
             return jsonify({
@@ -206,12 +212,12 @@ def reset_config():
             })
             
             # Get reset configuration
-            reset_config = get_queue_optimization_config()
+            reset_config = get_queue_optimization_config_dict()
             
             return jsonify({
                 'success': True,
                 'message': f'Configuration reset to defaults for {category or "all categories"}',
-                'configuration': asdict(reset_config)
+                'configuration': reset_config
             }), 200
         else:
             return jsonify({
@@ -230,61 +236,76 @@ def reset_config():
             'message': f'Error resetting configuration: {str(e)}'
         }), 500
 
+def _build_config_schema():
+    """Configuration schema for frontend validation (static per process)"""
+    from ..utils.config_manager import QueueOptimizationConfig
+    
+    # Get field information from dataclass
+    fields = QueueOptimizationConfig.__dataclass_fields__
+    
+    schema = {
+        'fields': {},
+        'categories': {
+            'general': ['optimization_interval_minutes', 'optimization_batch_size', 'max_optimization_time_seconds'],
+            'priority_weights': ['wait_time_weight', 'service_complexity_weight', 'citizen_priority_weight', 'demographic_weight'],
+            'thresholds': ['high_priority_threshold', 'reoptimization_threshold', 'max_wait_time_minutes'],
+            'service_settings': ['average_service_time_minutes', 'service_time_buffer_percentage'],
+            'agent_settings': ['enable_intelligent_assignment', 'agent_specialization_weight', 'agent_workload_balance_weight'],
+            'performance': ['enable_performance_monitoring', 'performance_log_level', 'cache_optimization_results', 'cache_ttl_seconds'],
+            'database': ['enable_transaction_optimization', 'transaction_retry_attempts', 'transaction_timeout_seconds'],
+            'notifications': ['enable_position_notifications', 'notification_threshold_positions', 'websocket_broadcast_enabled']
+        },
+        'validation_rules': {
+            'optimization_interval_minutes': {'min': 1, 'max': 60, 'type': 'int'},
+            'optimization_batch_size': {'min': 10, 'max': 1000, 'type': 'int'},
+            'max_optimization_time_seconds': {'min': 5, 'max': 300, 'type': 'int'},
+            'wait_time_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
+            'service_complexity_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
+            'citizen_priority_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
+            'demographic_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
+            'high_priority_threshold': {'min': 0.0, 'max': 100.0, 'type': 'float'},
+            'reoptimization_threshold': {'min': 0.0, 'max': 100.0, 'type': 'float'},
+            'max_wait_time_minutes': {'min': 1, 'max': 480, 'type': 'int'},
+            'average_service_time_minutes': {'min': 1, 'max': 60, 'type': 'int'},
+            'service_time_buffer_percentage': {'min': 0.0, 'max': 100.0, 'type': 'float'},
+            'performance_log_level': {'options': ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], 'type': 'str'}
+        }
+    }
+    
+    # Add field information
+    for field_name, field_info in fields.items():
+        field_type = field_info.type
+        default_value = field_info.default
+        
+        schema['fields'][field_name] = {
+            'type': field_type.__name__ if hasattr(field_type, '__name__') else str(field_type),
+            'default': default_value,
+            'required': field_info.default == field_info.default_factory if hasattr(field_info, 'default_factory') else True
+        }
+    
+    return schema
+
+# The schema never changes at runtime, so encode the whole response once
+try:
+    _SCHEMA_RESPONSE = json.dumps({'success': True, 'schema': _build_config_schema()}, sort_keys=True)
+    _SCHEMA_ETAG = hashlib.sha1(_SCHEMA_RESPONSE.encode()).hexdigest()
+except Exception:
+    _SCHEMA_RESPONSE = None  # fall back to building it per request
+    _SCHEMA_ETAG = None
+
 @config_api_bp.route('/schema', methods=['GET'])
 @jwt_required()
 def get_config_schema():
     """Get configuration schema for frontend validation"""
     try:
-        from ..utils.config_manager import QueueOptimizationConfig
-        import inspect
+        body = _SCHEMA_RESPONSE
+        if body is None:
+            body = json.dumps({'success': True, 'schema': _build_config_schema()}, sort_keys=True)
         
-        # Get field information from dataclass
-        fields = QueueOptimizationConfig.__dataclass_fields__
-        
-        schema = {
-            'fields': {},
-            'categories': {
-                'general': ['optimization_interval_minutes', 'optimization_batch_size', 'max_optimization_time_seconds'],
-                'priority_weights': ['wait_time_weight', 'service_complexity_weight', 'citizen_priority_weight', 'demographic_weight'],
-                'thresholds': ['high_priority_threshold', 'reoptimization_threshold', 'max_wait_time_minutes'],
-                'service_settings': ['average_service_time_minutes', 'service_time_buffer_percentage'],
-                'agent_settings': ['enable_intelligent_assignment', 'agent_specialization_weight', 'agent_workload_balance_weight'],
-                'performance': ['enable_performance_monitoring', 'performance_log_level', 'cache_optimization_results', 'cache_ttl_seconds'],
-                'database': ['enable_transaction_optimization', 'transaction_retry_attempts', 'transaction_timeout_seconds'],
-                'notifications': ['enable_position_notifications', 'notification_threshold_positions', 'websocket_broadcast_enabled']
-            },
-            'validation_rules': {
-                'optimization_interval_minutes': {'min': 1, 'max': 60, 'type': 'int'},
-                'optimization_batch_size': {'min': 10, 'max': 1000, 'type': 'int'},
-                'max_optimization_time_seconds': {'min': 5, 'max': 300, 'type': 'int'},
-                'wait_time_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
-                'service_complexity_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
-                'citizen_priority_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
-                'demographic_weight': {'min': 0.0, 'max': 1.0, 'type': 'float'},
-                'high_priority_threshold': {'min': 0.0, 'max': 100.0, 'type': 'float'},
-                'reoptimization_threshold': {'min': 0.0, 'max': 100.0, 'type': 'float'},
-                'max_wait_time_minutes': {'min': 1, 'max': 480, 'type': 'int'},
-                'average_service_time_minutes': {'min': 1, 'max': 60, 'type': 'int'},
-                'service_time_buffer_percentage': {'min': 0.0, 'max': 100.0, 'type': 'float'},
-                'performance_log_level': {'options': ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], 'type': 'str'}
-            }
-        }
-        
-        # Add field information
-        for field_name, field_info in fields.items():
-            field_type = field_info.type
-            default_value = field_info.default
-            
-            schema['fields'][field_name] = {
-                'type': field_type.__name__ if hasattr(field_type, '__name__') else str(field_type),
-                'default': default_value,
-                'required': field_info.default == field_info.default_factory if hasattr(field_info, 'default_factory') else True
-            }
-        
-        return jsonify({
-            'success': True,
-            'schema': schema
-        }), 200
+        response = Response(body, mimetype='application/json')
+        if _SCHEMA_ETAG is not None:
+            response.set_etag(_SCHEMA_ETAG)
+        return response.make_conditional(request)
         
     except Exception as e:
         queue_logger = get_queue_logger()
@@ -300,30 +321,56 @@ def get_config_history():
     """Get configuration change history"""
     try:
         from ..utils.config_manager import ConfigurationSetting
-        from sqlalchemy import desc
+        from ..extensions import db
+        from sqlalchemy import and_, or_, select
+        
+        # Cap page size so a large ?limit= cannot read the whole table
+        limit = min(max(request.args.get('limit', 50, type=int), 0), HISTORY_MAX_LIMIT)
+        before_id = request.args.get('before_id', type=int)
         
-        limit = request.args.get('limit', 50, type=int)
+        # Recent changes, newest first, selecting only the returned columns
+        stmt = select(
+            ConfigurationSetting.id, ConfigurationSetting.key, ConfigurationSetting.value,
+            ConfigurationSetting.category, ConfigurationSetting.updated_at,
+            ConfigurationSetting.updated_by, ConfigurationSetting.description
+        ).order_by(
+            ConfigurationSetting.updated_at.desc(), ConfigurationSetting.id.desc()
+        ).limit(limit)
         
-        # Get recent configuration changes
-        recent_changes = ConfigurationSetting.query.order_by(
-            desc(ConfigurationSetting.updated_at)
-        ).limit(limit).all()
+        # Keyset pagination: continue after the (updated_at, id) of before_id
+        # instead of OFFSET-scanning the rows already returned
+        if before_id is not None:
+            cursor_updated_at = select(ConfigurationSetting.updated_at).where(
+                ConfigurationSetting.id == before_id
+            ).scalar_subquery()
+            stmt = stmt.where(or_(
+                ConfigurationSetting.updated_at < cursor_updated_at,
+                and_(ConfigurationSetting.updated_at == cursor_updated_at,
+                     ConfigurationSetting.id < before_id)
+            ))
         
+        # Stream through a server-side cursor in bounded chunks
+        rows = db.session.execute(
+            stmt.execution_options(stream_results=True, yield_per=HISTORY_CHUNK_SIZE)
+        )
         history = []
-        for change in recent_changes:
+        last_id = None
+        for row in rows:
             history.append({
-                'key': change.key,
-                'value': change.value,
-                'category': change.category,
-                'updated_at': change.updated_at.isoformat(),
-                'updated_by': change.updated_by,
-                'description': change.description
+                'key': row.key,
+                'value': row.value,
+                'category': row.category,
+                'updated_at': row.updated_at.isoformat(),
+                'updated_by': row.updated_by,
+                'description': row.description
             })
+            last_id = row.id
         
         return jsonify({
             'success': True,
             'history': history,
-            'total_entries': len(history)
+            'total_entries': len(history),
+            'next_before_id': last_id if len(history) == limit else None
         }), 200
         
     except Exception as e:
@@ -1,19 +1,192 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..utils.queue_logger import get_queue_logger
+from ..utils.queue_logger import get_queue_logger, PERFORMANCE_AGGREGATES_PATH, AGGREGATE_FLUSH_DELAY
 from ..utils.db_transaction_manager import get_transaction_manager
 from ..utils.performance_metrics import get_performance_collector, take_performance_snapshot
 from ..models import Queue, Agent, Citizen, ServiceType
 from ..extensions import db
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_
+from functools import wraps
+from sqlalchemy import func, and_, text
+import glob
 import json
 import os
+import orjson
+import threading
+import time
 
 monitoring_api_bp = Blueprint('monitoring_api', __name__)
 
+# Bytes read per step when scanning a log file backwards from its end
+TAIL_CHUNK_SIZE = 256 * 1024
+
+# Raw performance entries returned alongside the aggregates
+RAW_METRICS_LIMIT = 100
+
+def _iter_tail_lines(path, chunk_size=TAIL_CHUNK_SIZE):
+    """Yield the non-empty lines of a file from last to first (as bytes)"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        position = os.lseek(fd, 0, os.SEEK_END)
+        remainder = b''
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            os.lseek(fd, position, os.SEEK_SET)
+            lines = (os.read(fd, read_size) + remainder).split(b'\n')
+            # The first piece may be the tail of a line that starts in the
+            # previous chunk; carry it over
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+    finally:
+        os.close(fd)
+
+def _log_files_since(log_file_path, cutoff_time):
+    """The active log file plus rotated ones written since cutoff_time, newest first"""
+    cutoff_ts = (cutoff_time - datetime(1970, 1, 1)).total_seconds()
+    # logrotate names them .1, .2, ... (or dated suffixes), so order by
+    # modification time; compressed archives can't be scanned in place
+    rotated = [
+        path for path in glob.glob(glob.escape(log_file_path) + '.*')
+        if not path.endswith(('.gz', '.bz2', '.xz', '.zst')) and os.path.getmtime(path) >= cutoff_ts
+    ]
+    rotated.sort(key=os.path.getmtime, reverse=True)
+    return [log_file_path] + rotated
+
+def _parse_log_entry(line):
+    """Decode the JSON payload of a log line, skipping the formatter prefix"""
+    start = line.find(b'{')
+    if start < 0:
+        return None
+    try:
+        # orjson decodes the bytes slice directly, without a str round-trip
+        return orjson.loads(line[start:])
+    except orjson.JSONDecodeError:
+        return None
+
+def _load_performance_aggregates(cutoff_time):
+    """Merge the per-minute aggregate rows from cutoff_time (a whole minute) on
+    
+    Returns (operation_stats, total_operations, flushed, earliest_bucket):
+    flushed holds the (pid, bucket) pairs whose raw log entries are already
+    counted, and earliest_bucket is the oldest minute the sidecar still has.
+    Rows arrive out of order across processes, so every row is checked
+    rather than stopping at the first old one.
+    """
+    operation_stats = {}
+    total_operations = 0
+    flushed = set()
+    earliest_bucket = None
+    if not os.path.exists(PERFORMANCE_AGGREGATES_PATH):
+        return operation_stats, total_operations, flushed, earliest_bucket
+    
+    cutoff_bucket = cutoff_time.isoformat()[:16]
+    for path in _log_files_since(PERFORMANCE_AGGREGATES_PATH, cutoff_time):
+        with open(path, 'rb') as f:
+            for line in f:
+                row = _parse_log_entry(line)
+                if not isinstance(row, dict):
+                    continue
+                try:
+                    pid, bucket, op, count = row['pid'], row['bucket'], row['operation'], row['count']
+                    total, low, high = row['sum_ms'], row['min_ms'], row['max_ms']
+                except KeyError:
+                    continue
+                if earliest_bucket is None or bucket < earliest_bucket:
+                    earliest_bucket = bucket
+                if bucket < cutoff_bucket:
+                    continue
+                
+                flushed.add((pid, bucket))
+                total_operations += count
+                stats = operation_stats.get(op)
+                if stats is None:
+                    operation_stats[op] = {
+                        'count': count,
+                        'total_duration': total,
+                        'min_duration': low,
+                        'max_duration': high
+                    }
+                    continue
+                stats['count'] += count
+                stats['total_duration'] += total
+                stats['min_duration'] = min(stats['min_duration'], low)
+                stats['max_duration'] = max(stats['max_duration'], high)
+    
+    return operation_stats, total_operations, flushed, earliest_bucket
+
+def _iter_recent_log_entries(log_file_path, cutoff_time):
+    """Yield log entries timestamped at or after cutoff_time, newest first
+    
+    Files are read backwards, so the scan stops at the first older entry
+    instead of parsing the whole history.
+    """
+    # The loggers write naive UTC isoformat() timestamps, which sort
+    # lexicographically, so compare strings instead of parsing each one
+    cutoff_iso = cutoff_time.isoformat()
+    for path in _log_files_since(log_file_path, cutoff_time):
+        for line in _iter_tail_lines(path):
+            log_entry = _parse_log_entry(line)
+            if not isinstance(log_entry, dict):
+                continue
+            timestamp = log_entry.get('timestamp')
+            if not isinstance(timestamp, str):
+                continue
+            if timestamp < cutoff_iso:
+                return
+            yield log_entry
+
+# Encoded bodies of recent 200 responses: key -> (body, expires_at)
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+def _ttl_cached(ttl, key_fn=None):
+    """Serve a polled endpoint's successful response from memory for ttl seconds
+    
+    The encoded body is cached, so hits skip both the work and jsonify.
+    Pass ?nocache=1 to bypass the cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.args.get('nocache'):
+                return view(*args, **kwargs)
+            
+            key = (view.__name__,) + (key_fn() if key_fn else ())
+            now = time.monotonic()
+            with _response_cache_lock:
+                cached = _response_cache.get(key)
+            if cached and cached[1] > now:
+                return Response(cached[0], mimetype='application/json')
+            
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                with _response_cache_lock:
+                    # Keys include query args, so drop expired ones as we go
+                    for stale in [k for k, v in _response_cache.items() if v[1] <= now]:
+                        del _response_cache[stale]
+                    _response_cache[key] = (response.get_data(), now + ttl)
+            return response
+        return wrapper
+    return decorator
+
+def _collect_counts():
+    """Queue and agent counts keyed by status, one grouped query each"""
+    queue_counts = dict(
+        db.session.query(Queue.status, func.count(Queue.id)).group_by(Queue.status).all()
+    )
+    agent_counts = dict(
+        db.session.query(Agent.status, func.count(Agent.id)).group_by(Agent.status).all()
+    )
+    return queue_counts, agent_counts
+
 @monitoring_api_bp.route('/statistics', methods=['GET'])
 @jwt_required()
+@_ttl_cached(3, key_fn=lambda: (request.args.get('hours', 24, type=int),))
 def get_queue_statistics():
     """Get comprehensive queue statistics"""
     try:
@@ -23,22 +196,27 @@ def get_queue_statistics():
         # Get statistics from logger
         stats = queue_logger.get_queue_statistics(hours)
         
-        # Add real-time queue status
-        current_waiting = db.session.query(Queue).filter_by(status='waiting').count()
-        current_in_progress = db.session.query(Queue).filter_by(status='in_progress').count()
-        
-        # Get agent statistics
-        total_agents = db.session.query(Agent).count()
-        available_agents = db.session.query(Agent).filter_by(status='available').count()
-        busy_agents = db.session.query(Agent).filter_by(status='busy').count()
-        
-        # Get service type distribution
-        service_distribution = db.session.query(
-            ServiceType.name,
+        # Add real-time queue and agent status
+        queue_counts, agent_counts = _collect_counts()
+        current_waiting = queue_counts.get('waiting', 0)
+        current_in_progress = queue_counts.get('in_progress', 0)
+        total_agents = sum(agent_counts.values())
+        available_agents = agent_counts.get('available', 0)
+        busy_agents = agent_counts.get('busy', 0)
+        
+        # Get service type distribution: count per service_type_id over the
+        # (created_at, service_type_id) index first, then join the few
+        # grouped rows to ServiceType for the names
+        service_counts = db.session.query(
+            Queue.service_type_id,
             func.count(Queue.id).label('count')
-        ).join(Queue).filter(
+        ).filter(
             Queue.created_at >= datetime.utcnow() - timedelta(hours=hours)
-        ).group_by(ServiceType.name).all()
+        ).group_by(Queue.service_type_id).subquery()
+        service_distribution = db.session.query(
+            ServiceType.name_fr,
+            service_counts.c.count
+        ).join(service_counts, ServiceType.id == service_counts.c.service_type_id).all()
         
         stats.update({
             'current_status': {
@@ -84,58 +262,71 @@ def get_performance_metrics():
                 'message': 'No performance data available yet'
             }), 200
         
-        metrics = []
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        with open(log_file_path, 'r') as f:
-            for line in f:
-                try:
-                    log_entry = json.loads(line.strip())
-                    log_time = datetime.fromisoformat(log_entry['timestamp'].replace('Z', '+00:00'))
-                    
-                    if log_time >= cutoff_time:
-                        metrics.append({
-                            'timestamp': log_entry['timestamp'],
-                            'operation': log_entry['operation'],
-                            'duration_ms': log_entry['duration_ms'],
-                            'additional_data': log_entry.get('additional_data', {})
-                        })
-                except (json.JSONDecodeError, KeyError, ValueError):
-                    continue
-        
-        # Calculate aggregated metrics
-        operation_stats = {}
-        for metric in metrics:
-            op = metric['operation']
-            if op not in operation_stats:
-                operation_stats[op] = {
-                    'count': 0,
-                    'total_duration': 0,
-                    'min_duration': float('inf'),
-                    'max_duration': 0
-                }
+        # The window starts on a whole minute so it lines up with the
+        # per-minute aggregate rows
+        cutoff_time = (datetime.utcnow() - timedelta(hours=hours)).replace(second=0, microsecond=0)
+        
+        # Whole minutes come pre-aggregated from the sidecar file. The raw
+        # log adds only entries whose (pid, minute) has no row yet, and is
+        # otherwise read for the newest RAW_METRICS_LIMIT entries. Past the
+        # flush delay every live process has written its rows, so once those
+        # entries are collected the scan stops at the first flushed one -
+        # provided the sidecar reaches back to the window start
+        operation_stats, total_operations, flushed, earliest_bucket = _load_performance_aggregates(cutoff_time)
+        can_stop_early = earliest_bucket is not None and earliest_bucket <= cutoff_time.isoformat()[:16]
+        settled_bucket = (datetime.utcnow() - timedelta(seconds=60 + AGGREGATE_FLUSH_DELAY)).isoformat()[:16]
+        recent = []
+        for log_entry in _iter_recent_log_entries(log_file_path, cutoff_time):
+            try:
+                op = log_entry['operation']
+                duration = log_entry['duration_ms']
+                timestamp = log_entry['timestamp']
+            except KeyError:
+                continue
             
-            stats = operation_stats[op]
-            duration = metric['duration_ms']
+            bucket = timestamp[:16]
+            aggregated = (log_entry.get('pid'), bucket) in flushed
+            if can_stop_early and aggregated and len(recent) >= RAW_METRICS_LIMIT and bucket < settled_bucket:
+                break
+            if len(recent) < RAW_METRICS_LIMIT:
+                recent.append({
+                    'timestamp': timestamp,
+                    'operation': op,
+                    'duration_ms': duration,
+                    'additional_data': log_entry.get('additional_data', {})
+                })
+            if aggregated:
+                continue
             
+            total_operations += 1
+            stats = operation_stats.get(op)
+            if stats is None:
+                operation_stats[op] = {
+                    'count': 1,
+                    'total_duration': duration,
+                    'min_duration': duration,
+                    'max_duration': duration
+                }
+                continue
             stats['count'] += 1
             stats['total_duration'] += duration
-            stats['min_duration'] = min(stats['min_duration'], duration)
-            stats['max_duration'] = max(stats['max_duration'], duration)
+            if duration < stats['min_duration']:
+                stats['min_duration'] = duration
+            if duration > stats['max_duration']:
+                stats['max_duration'] = duration
+        # Entries were read newest first; keep the response oldest first
+        recent.reverse()
         
         # Calculate averages
-        for op, stats in operation_stats.items():
-            if stats['count'] > 0:
-                stats['avg_duration'] = round(stats['total_duration'] / stats['count'], 2)
-                if stats['min_duration'] == float('inf'):
-                    stats['min_duration'] = 0
+        for stats in operation_stats.values():
+            stats['avg_duration'] = round(stats['total_duration'] / stats['count'], 2)
         
         return jsonify({
             'success': True,
             'metrics': {
-                'raw_metrics': metrics[-100:],  # Last 100 entries
+                'raw_metrics': recent,  # Last RAW_METRICS_LIMIT entries
                 'aggregated_stats': operation_stats,
-                'total_operations': len(metrics)
+                'total_operations': total_operations
             }
         }), 200
         
@@ -168,29 +359,22 @@ def get_error_logs():
         errors = []
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
-        with open(log_file_path, 'r') as f:
-            for line in f:
-                try:
-                    log_entry = json.loads(line.strip())
-                    log_time = datetime.fromisoformat(log_entry['timestamp'].replace('Z', '+00:00'))
-                    
-                    if log_time >= cutoff_time:
-                        # Remove full traceback for API response (too verbose)
-                        error_summary = {
-                            'timestamp': log_entry['timestamp'],
-                            'error_type': log_entry['error_type'],
-                            'error_message': log_entry['error_message'],
-                            'context': log_entry.get('context', {}),
-                            'request_id': log_entry.get('request_id'),
-                            'user_id': log_entry.get('user_id')
-                        }
-                        errors.append(error_summary)
-                        
-                        if len(errors) >= limit:
-                            break
-                            
-                except (json.JSONDecodeError, KeyError, ValueError):
-                    continue
+        for log_entry in _iter_recent_log_entries(log_file_path, cutoff_time):
+            if len(errors) >= limit:
+                break
+            try:
+                # Remove full traceback for API response (too verbose)
+                error_summary = {
+                    'timestamp': log_entry['timestamp'],
+                    'error_type': log_entry['error_type'],
+                    'error_message': log_entry['error_message'],
+                    'context': log_entry.get('context', {}),
+                    'request_id': log_entry.get('request_id'),
+                    'user_id': log_entry.get('user_id')
+                }
+            except KeyError:
+                continue
+            errors.append(error_summary)
         
         # Sort by timestamp (most recent first)
         errors.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -210,19 +394,21 @@ def get_error_logs():
         }), 500
 
 @monitoring_api_bp.route('/health-check', methods=['GET'])
+@_ttl_cached(3)
 def health_check():
     """System health check endpoint"""
     try:
-        # Check database connectivity
-        db.session.execute('SELECT 1')
+        # Check database connectivity on a bare pooled connection: no ORM
+        # session, autoflush or session transaction for a probe endpoint
+        with db.engine.connect() as conn:
+            conn.scalar(text('SELECT 1'))
         db_status = 'healthy'
         
-        # Check queue status
-        queue_count = db.session.query(Queue).filter_by(status='waiting').count()
-        
-        # Check agent availability
-        available_agents = db.session.query(Agent).filter_by(status='available').count()
-        total_agents = db.session.query(Agent).count()
+        # Check queue status and agent availability
+        queue_counts, agent_counts = _collect_counts()
+        queue_count = queue_counts.get('waiting', 0)
+        available_agents = agent_counts.get('available', 0)
+        total_agents = sum(agent_counts.values())
         
         # Determine overall health
         health_status = 'healthy'
@@ -260,6 +446,7 @@ def health_check():
 
 @monitoring_api_bp.route('/system-info', methods=['GET'])
 @jwt_required()
+@_ttl_cached(60)
 def get_system_info():
     """Get system information and configuration"""
     try:
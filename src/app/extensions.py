@@ -1,3 +1,4 @@
+import sqlite3
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -12,6 +13,8 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
 from pytz import utc
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # Initialize extensions
 socketio = SocketIO(cors_allowed_origins="*")
@@ -29,3 +32,15 @@ queue_scheduler = None
 
 # Initialize transaction manager - will be configured after app creation
 transaction_manager = None
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling on SQLite so commits fsync once and readers don't
+    block the writer (e.g. the app running alongside a seed script)"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
@@ -1,11 +1,26 @@
 from .extensions import db
 from datetime import datetime
+from flask import current_app, has_app_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy import Index
 from .utils.encryption import encryption
 from flask_login import UserMixin
 
+def hash_password(password):
+    """Hash a password with Werkzeug's default method.
+
+    Test-only: when app.testing is true, CREDENTIAL_ROUNDS switches to
+    PBKDF2-SHA256 with 2**CREDENTIAL_ROUNDS iterations (a log2 work factor,
+    as with bcrypt cost) so test suites hash quickly. Outside testing the
+    setting is ignored, so it can never weaken stored passwords.
+    """
+    testing = has_app_context() and current_app.testing
+    rounds = current_app.config.get('CREDENTIAL_ROUNDS') if testing else None
+    if rounds is None:
+        return generate_password_hash(password)
+    return generate_password_hash(password, method=f'pbkdf2:sha256:{2 ** int(rounds)}')
+
 class Citizen(db.Model):
     __tablename__ = 'citizens'
     id = db.Column(db.Integer, primary_key=True)
@@ -152,7 +167,7 @@ class Agent(UserMixin, db.Model):
             self._phone = None
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -263,6 +278,22 @@ class AuditLog(db.Model):
     def __repr__(self):
         return f'<AuditLog {self.action} by {self.user_id}>'
 
+class ReorderJob(db.Model):
+    __tablename__ = 'reorder_jobs'
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    state = db.Column(db.String(20), nullable=False, default='running')  # running, completed, failed
+    # 1 while running, NULL once finished: the unique constraint lets only
+    # one reorder run at a time across all worker processes
+    active_slot = db.Column(db.Integer, unique=True)
+    result = db.Column(db.JSON)
+    submitted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Refreshed while the job runs; a stale heartbeat means its worker died
+    heartbeat_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<ReorderJob {self.id} - {self.state}>'
+
 # Performance Indexes
 # Citizens table indexes
 Index('idx_citizens_pre_enrollment_code', Citizen.pre_enrollment_code)
@@ -276,6 +307,14 @@ Index('idx_queue_entries_created_at', Queue.created_at)
 Index('idx_queue_entries_called_at', Queue.called_at)
 Index('idx_queue_entries_completed_at', Queue.completed_at)
 Index('idx_queue_entries_citizen_service', Queue.citizen_id, Queue.service_type_id)
+# Covers the created_at-windowed per-service counts (monitoring statistics)
+Index('idx_queue_entries_created_service', Queue.created_at, Queue.service_type_id)
+Index('idx_queue_entries_agent_status', Queue.agent_id, Queue.status)
+Index('idx_queue_entries_status_agent', Queue.status, Queue.agent_id)
+# Partial index matching the waiting-queue ordering, so the reorder and
+# next-ticket queries walk it in order with no sort step
+Index('idx_queue_entries_waiting_priority', Queue.priority_score.desc(), Queue.created_at.asc(),
+      postgresql_where=(Queue.status == 'waiting'), sqlite_where=(Queue.status == 'waiting'))
 
 # Agents table indexes
 Index('idx_agents_employee_id', Agent.employee_id)
@@ -1,12 +1,13 @@
 import os
 import json
+import hashlib
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from datetime import datetime
 from flask import current_app
 from ..extensions import db
 from ..models import db as database
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 import logging
 
@@ -30,6 +31,9 @@ class ConfigurationSetting(db.Model):
     def __repr__(self):
         return f'<ConfigurationSetting {self.key}={self.value}>'
 
+# Change-history ordering (updated_at DESC, id DESC) and its keyset cursor
+Index('idx_configuration_settings_updated', ConfigurationSetting.updated_at, ConfigurationSetting.id)
+
 @dataclass
 class QueueOptimizationConfig:
     """Queue optimization configuration with validation"""
@@ -250,6 +254,36 @@ class ConfigurationManager:
             # Return default configuration as fallback
             return QueueOptimizationConfig()
     
+    def get_config_dict(self) -> Dict[str, Any]:
+        """Get current configuration as a plain dict
+        
+        The dict is kept in the config cache next to the config it was built
+        from, so it is rebuilt only when that config is reloaded, updated or
+        reset. Callers must treat it as read-only.
+        """
+        config = self.get_config()
+        cache = self._config_cache
+        if cache.get('config') is config and 'dict' in cache:
+            return cache['dict']
+        
+        # Fields are all scalars, so a shallow copy is enough (no asdict deepcopy)
+        config_dict = {f.name: getattr(config, f.name) for f in fields(config)}
+        if cache.get('config') is config:
+            cache['dict'] = config_dict
+        return config_dict
+    
+    def get_config_etag(self) -> str:
+        """ETag of the current configuration, cached next to its dict"""
+        config_dict = self.get_config_dict()
+        cache = self._config_cache
+        if cache.get('dict') is config_dict and 'etag' in cache:
+            return cache['etag']
+        
+        etag = hashlib.sha1(json.dumps(config_dict, sort_keys=True).encode()).hexdigest()
+        if cache.get('dict') is config_dict:
+            cache['etag'] = etag
+        return etag
+    
     def update_config(self, updates: Dict[str, Any], updated_by: str = 'system') -> bool:
         """Update configuration settings"""
         try:
@@ -412,4 +446,9 @@ def get_config_manager(app=None) -> ConfigurationManager:
 def get_queue_optimization_config() -> QueueOptimizationConfig:
     """Get current queue optimization configuration"""
     config_manager = get_config_manager()
-    return config_manager.get_config()
\ No newline at end of file
+    return config_manager.get_config()
+
+def get_queue_optimization_config_dict() -> Dict[str, Any]:
+    """Get current queue optimization configuration as a (read-only) dict"""
+    config_manager = get_config_manager()
+    return config_manager.get_config_dict()
\ No newline at end of file
@@ -0,0 +1,23 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+    
+    Output matches DefaultJSONProvider: keys are sorted, and datetimes and
+    dataclasses are passed through to its ``default`` hook (HTTP dates,
+    ``asdict``) instead of orjson's native encodings.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        option = (orjson.OPT_NON_STR_KEYS
+                  | orjson.OPT_PASSTHROUGH_DATETIME
+                  | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
@@ -1,5 +1,10 @@
+import atexit
 import logging
+import logging.handlers
 import json
+import os
+import queue
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 from functools import wraps
@@ -10,6 +15,17 @@ from ..models import Queue, Agent, Citizen
 import traceback
 import time
 
+# Per-minute performance aggregates, one JSON row per (pid, minute, operation):
+# {"pid", "bucket": "YYYY-MM-DDTHH:MM", "operation", "count", "sum_ms", "min_ms", "max_ms"}
+# Each process flushes its own finished minutes, on a wall-clock timer and at
+# exit; readers merge the rows and skip raw entries whose (pid, minute) has a
+# row. Rotate this file with logrotate alongside queue_performance.log.
+PERFORMANCE_AGGREGATES_PATH = 'logs/queue_performance.aggregates.jsonl'
+
+# Seconds past the end of a minute before the timer flushes it; by then every
+# live process has written its row for that minute
+AGGREGATE_FLUSH_DELAY = 5
+
 class QueueLogger:
     """Comprehensive logging system for queue operations"""
     
@@ -19,6 +35,13 @@ class QueueLogger:
         self.performance_logger = None
         self.error_logger = None
         
+        # Running aggregates for the current minute: operation -> [count, sum, min, max].
+        # _aggregate_pid tells a forked worker to drop its parent's state.
+        self._aggregate_lock = threading.Lock()
+        self._aggregate_pid = None
+        self._aggregate_bucket = None
+        self._aggregates = {}
+        
         if app is not None:
             self.init_app(app)
     
@@ -51,15 +74,27 @@ class QueueLogger:
             
         queue_handler = logging.FileHandler('logs/queue_operations.log')
         queue_handler.setFormatter(formatter)
-        self.logger.addHandler(queue_handler)
         
-        performance_handler = logging.FileHandler('logs/queue_performance.log')
+        # Every worker process appends to the same files, so rotation is left
+        # to an external logrotate; WatchedFileHandler reopens the file once it
+        # has been moved. The monitoring API skips rotated files older than
+        # the requested window.
+        performance_handler = logging.handlers.WatchedFileHandler('logs/queue_performance.log')
         performance_handler.setFormatter(formatter)
-        self.performance_logger.addHandler(performance_handler)
         
-        error_handler = logging.FileHandler('logs/queue_errors.log')
+        error_handler = logging.handlers.WatchedFileHandler('logs/queue_errors.log')
         error_handler.setFormatter(formatter)
-        self.error_logger.addHandler(error_handler)
+        
+        # Request threads only enqueue records; a single listener thread does
+        # the file I/O. Each logger's records are routed to its own file.
+        self._add_queued_handlers([
+            (self.logger, queue_handler),
+            (self.performance_logger, performance_handler),
+            (self.error_logger, error_handler)
+        ])
+        
+        # Write out the last partial minute of aggregates on shutdown
+        atexit.register(self.flush_performance_aggregates)
         
         # Setup database event listeners
         self._setup_db_listeners()
@@ -67,6 +102,22 @@ class QueueLogger:
         # Store logger instance in app
         app.queue_logger = self
     
+    def _add_queued_handlers(self, routes):
+        """Put the (logger, handler) routes behind one queue and listener thread"""
+        records = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(records)
+        for logger, handler in routes:
+            logger.addHandler(queue_handler)
+            # The listener offers every record to every handler; keep only
+            # the records of the logger this handler belongs to
+            handler.addFilter(logging.Filter(logger.name))
+        listener = logging.handlers.QueueListener(
+            records, *(handler for _, handler in routes), respect_handler_level=True
+        )
+        listener.start()
+        # Drain pending records on interpreter shutdown
+        atexit.register(listener.stop)
+    
     def _setup_db_listeners(self):
         """Setup SQLAlchemy event listeners for queue operations"""
         
@@ -140,10 +191,87 @@ class QueueLogger:
             'operation': operation,
             'duration_ms': round(duration * 1000, 2),
             'request_id': getattr(g, 'request_id', None),
+            'pid': os.getpid(),
             'additional_data': additional_data or {}
         }
         
         self.performance_logger.info(json.dumps(metric_entry))
+        self._aggregate_performance_metric(metric_entry)
+    
+    def _aggregate_performance_metric(self, metric_entry: Dict[str, Any]):
+        """Fold a metric into its minute's aggregates"""
+        bucket = metric_entry['timestamp'][:16]
+        operation = metric_entry['operation']
+        duration = metric_entry['duration_ms']
+        with self._aggregate_lock:
+            if self._aggregate_pid != metric_entry['pid']:
+                # First metric in this process: start its flush timer
+                self._aggregate_pid = metric_entry['pid']
+                self._aggregate_bucket = None
+                self._aggregates = {}
+                threading.Thread(target=self._flush_aggregates_periodically, daemon=True).start()
+            
+            if self._aggregate_bucket is None or bucket > self._aggregate_bucket:
+                self._write_aggregates()
+                self._aggregate_bucket = bucket
+            elif bucket < self._aggregate_bucket:
+                # Timestamped just before the minute rolled over; its minute
+                # may already be flushed, so write it as a row of its own
+                self._write_aggregate_rows(bucket, {operation: [1, duration, duration, duration]})
+                return
+            
+            stats = self._aggregates.get(operation)
+            if stats is None:
+                self._aggregates[operation] = [1, duration, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] = min(stats[2], duration)
+                stats[3] = max(stats[3], duration)
+    
+    def _flush_aggregates_periodically(self):
+        """Flush each finished minute shortly after it ends, even when idle"""
+        while True:
+            time.sleep(60 - time.time() % 60 + AGGREGATE_FLUSH_DELAY)
+            current_bucket = datetime.utcnow().isoformat()[:16]
+            with self._aggregate_lock:
+                if self._aggregate_bucket is not None and self._aggregate_bucket < current_bucket:
+                    self._write_aggregates()
+                    # Late metrics for the flushed minute get rows of their own
+                    self._aggregate_bucket = current_bucket
+    
+    def flush_performance_aggregates(self):
+        """Write out the current minute's aggregates"""
+        with self._aggregate_lock:
+            self._write_aggregates()
+    
+    def _write_aggregates(self):
+        """Write and reset the pending minute; caller holds _aggregate_lock"""
+        if self._aggregates and self._aggregate_pid == os.getpid():
+            self._write_aggregate_rows(self._aggregate_bucket, self._aggregates)
+        self._aggregates = {}
+    
+    def _write_aggregate_rows(self, bucket: str, aggregates: Dict[str, list]):
+        """Append one row per operation for this process and bucket"""
+        rows = ''.join(
+            json.dumps({
+                'pid': self._aggregate_pid,
+                'bucket': bucket,
+                'operation': operation,
+                'count': count,
+                'sum_ms': round(total, 2),
+                'min_ms': low,
+                'max_ms': high
+            }) + '\n'
+            for operation, (count, total, low, high) in aggregates.items()
+        )
+        try:
+            # One append per flush; O_APPEND keeps processes' rows whole
+            with open(PERFORMANCE_AGGREGATES_PATH, 'a') as f:
+                f.write(rows)
+        except OSError:
+            # Aggregates are an optimization; the raw log still has every metric
+            pass
     
     def log_error(self, error: Exception, context: Dict[str, Any] = None):
         """Log errors with context"""
@@ -2,6 +2,7 @@ import logging
 from logging.config import fileConfig
 
 from flask import current_app
+from sqlalchemy import text
 
 from alembic import context
 
@@ -97,6 +98,12 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Index builds and backfills may run long; never apply the
+            # app's DATABASE_STATEMENT_TIMEOUT_MS to migrations
+            connection.execute(text('SET statement_timeout = 0'))
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
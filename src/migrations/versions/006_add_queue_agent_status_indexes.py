@@ -0,0 +1,27 @@
+"""Add composite agent/status indexes on queue
+
+Revision ID: 006
+Revises: b4006e0193f6
+Create Date: 2025-08-01 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '006'
+down_revision = 'b4006e0193f6'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # agent_id = ? AND status IN (...) lookups (agent dashboards, call next)
+    # and status = ? AND agent_id IS [NOT] NULL scans (assignment, fix scripts)
+    with op.batch_alter_table('queue', schema=None) as batch_op:
+        batch_op.create_index('idx_queue_entries_agent_status', ['agent_id', 'status'], unique=False)
+        batch_op.create_index('idx_queue_entries_status_agent', ['status', 'agent_id'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('queue', schema=None) as batch_op:
+        batch_op.drop_index('idx_queue_entries_status_agent')
+        batch_op.drop_index('idx_queue_entries_agent_status')
@@ -0,0 +1,39 @@
+"""Add partial waiting-queue priority index on queue
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-08-04 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+WAITING = sa.text("status = 'waiting'")
+
+def upgrade():
+    # status = 'waiting' ORDER BY priority_score DESC, created_at ASC
+    # (advanced reorder, next ticket). idx_queue_entries_status already
+    # serves the status counts.
+    columns = [sa.text('priority_score DESC'), sa.text('created_at ASC')]
+    if op.get_context().dialect.name == 'postgresql':
+        # Build without locking writes to the live queue table
+        with op.get_context().autocommit_block():
+            op.create_index('idx_queue_entries_waiting_priority', 'queue', columns,
+                            postgresql_where=WAITING, postgresql_concurrently=True)
+    else:
+        op.create_index('idx_queue_entries_waiting_priority', 'queue', columns,
+                        sqlite_where=WAITING)
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('idx_queue_entries_waiting_priority', table_name='queue',
+                          postgresql_concurrently=True)
+    else:
+        op.drop_index('idx_queue_entries_waiting_priority', table_name='queue')
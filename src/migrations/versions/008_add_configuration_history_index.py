@@ -0,0 +1,24 @@
+"""Add updated_at/id index on configuration_settings
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-08-05 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Config history: ORDER BY updated_at DESC, id DESC with a keyset cursor
+    with op.batch_alter_table('configuration_settings', schema=None) as batch_op:
+        batch_op.create_index('idx_configuration_settings_updated', ['updated_at', 'id'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('configuration_settings', schema=None) as batch_op:
+        batch_op.drop_index('idx_configuration_settings_updated')
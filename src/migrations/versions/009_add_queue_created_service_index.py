@@ -0,0 +1,34 @@
+"""Add created_at/service_type_id index on queue
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-08-06 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # created_at >= ? GROUP BY service_type_id (monitoring statistics)
+    if op.get_context().dialect.name == 'postgresql':
+        # Build without locking writes to the live queue table
+        with op.get_context().autocommit_block():
+            op.create_index('idx_queue_entries_created_service', 'queue',
+                            ['created_at', 'service_type_id'], postgresql_concurrently=True)
+    else:
+        op.create_index('idx_queue_entries_created_service', 'queue',
+                        ['created_at', 'service_type_id'])
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('idx_queue_entries_created_service', table_name='queue',
+                          postgresql_concurrently=True)
+    else:
+        op.drop_index('idx_queue_entries_created_service', table_name='queue')
@@ -0,0 +1,32 @@
+"""Add reorder_jobs table
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-08-07 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Background queue reorders, visible to every worker process
+    op.create_table('reorder_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('active_slot', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('submitted_at', sa.DateTime(), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('active_slot')
+    )
+
+def downgrade():
+    op.drop_table('reorder_jobs')
@@ -0,0 +1,13 @@
+"""Buffered console output for the maintenance scripts"""
+
+import sys
+
+def emit_lines(lines):
+    """Write lines to stdout in one call
+
+    Per-row print() calls each format and write separately (and flush on
+    every line when stdout is a TTY); row loops collect their lines and
+    emit them together instead.
+    """
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
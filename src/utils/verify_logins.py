@@ -0,0 +1,53 @@
+"""Login credential checks shared by the agent maintenance scripts"""
+
+from functools import lru_cache
+
+from werkzeug.security import check_password_hash
+
+from app.models import Agent
+
+# Default accounts created by the seed scripts
+TEST_CREDENTIALS = [
+    ('ADMIN001', 'admin123'),
+    ('AGENT001', 'agent123'),
+    ('AGENT002', 'agent123'),
+    ('AGENT003', 'agent123')
+]
+
+@lru_cache(maxsize=64)
+def verify_password(password_hash, password):
+    """Memoized check_password_hash; seeded agents share hashes and passwords"""
+    return check_password_hash(password_hash, password)
+
+@lru_cache(maxsize=256)
+def identify_password(password_hash, candidates):
+    """Return the first of candidates matching password_hash, or None
+
+    Cached per hash, so agents sharing a hash cost one pass over the
+    candidates. Hashes without Werkzeug's method$salt$hash layout are
+    rejected without running the KDF.
+    """
+    if password_hash.count('$') != 2:
+        return None
+    for password in candidates:
+        if verify_password(password_hash, password):
+            return password
+    return None
+
+def verify_logins(credentials=TEST_CREDENTIALS):
+    """Check (employee_id, password) pairs against the agents table
+
+    All referenced agents are loaded in a single query. Yields
+    (employee_id, password, agent, works) per pair; agent is None when the
+    employee_id does not exist.
+    """
+    employee_ids = {employee_id for employee_id, _ in credentials}
+    agents = {
+        agent.employee_id: agent
+        for agent in Agent.query.filter(Agent.employee_id.in_(employee_ids)).all()
+    }
+
+    for employee_id, password in credentials:
+        agent = agents.get(employee_id)
+        works = bool(agent and agent.password_hash and verify_password(agent.password_hash, password))
+        yield employee_id, password, agent, works
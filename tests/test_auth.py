@@ -24,3 +24,22 @@ class AuthTestCase(BaseTestCase):
             json={'email': 'test@example.com', 'password': 'password'})
         self.assertEqual(response.status_code, 200)
         self.assertIn('access_token', response.get_json())
+
+    def test_credential_rounds_lowers_hash_cost(self):
+        self.app.config['CREDENTIAL_ROUNDS'] = 4
+        self.app.testing = True
+        agent = Agent(employee_id='124', email='rounds@example.com', first_name='Test', last_name='User')
+        agent.set_password('password')
+
+        self.assertTrue(agent.password_hash.startswith('pbkdf2:sha256:16$'))
+        self.assertTrue(agent.check_password('password'))
+        self.assertFalse(agent.check_password('wrong'))
+
+    def test_credential_rounds_ignored_outside_testing(self):
+        self.app.config['CREDENTIAL_ROUNDS'] = 4
+        self.app.testing = False
+        agent = Agent(employee_id='125', email='prod@example.com', first_name='Test', last_name='User')
+        agent.set_password('password')
+
+        self.assertFalse(agent.password_hash.startswith('pbkdf2:sha256:16$'))
+        self.assertTrue(agent.check_password('password'))